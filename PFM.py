@@ -1,7 +1,232 @@
+import bisect
+import itertools
 import json
+import os
+import shutil
+import threading
 from datetime import datetime
 
-expenses = []
+EXPENSES_FILE = "expenses.jsonl"
+LEGACY_FILE = "expenses.json"
+SYNC_EVERY = 32       # appended records per group-commit fsync
+SYNC_INTERVAL = 1.0   # seconds an appended record may wait for its fsync
+PAGE_SIZE = 20        # expenses printed per page by view_expenses
+
+
+class ExpenseLog:
+    """Expense records persisted as an append-only JSON Lines file.
+
+    Each expense is appended as one line and flushed to the OS straight
+    away, so a crash of the program loses nothing.  fsync is grouped: it
+    runs once SYNC_EVERY records are waiting, and a background autosave
+    thread covers the rest within SYNC_INTERVAL seconds.  Nothing is read
+    at startup; iterating streams the file one line at a time.  A line
+    left half-written by a crash is cut off on open, and unreadable lines
+    found while streaming are dropped by a background compaction that
+    swaps in a rewritten file atomically.
+
+    query() answers date-range and category filters from two indexes of
+    byte offsets into the file, built on the first query and kept up to
+    date by append: a list sorted by date and, per category, the same kind
+    of list for that category alone.  Only the matching lines are read.
+    """
+
+    def __init__(self, path=EXPENSES_FILE, legacy_path=LEGACY_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.unsynced = 0
+        self.compactor = None
+        self.closed = threading.Event()
+        self.by_date = None       # sorted [(date, offset)], None until first query
+        self.by_category = None   # category -> sorted [(date, offset)]
+        if not os.path.exists(path) and os.path.exists(legacy_path):
+            self.import_legacy(legacy_path)
+        self.drop_torn_tail()
+        self.file = open(path, "ab")
+        self.size = os.path.getsize(path)
+        self.autosaver = threading.Thread(target=self.autosave, daemon=True)
+        self.autosaver.start()
+
+    def import_legacy(self, legacy_path):
+        """Convert a whole-file expenses.json from older versions into the log."""
+        with open(legacy_path) as f:
+            records = json.load(f)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def drop_torn_tail(self):
+        """Cut off a final line that a crash left without its newline."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as f:
+            end = f.seek(0, os.SEEK_END)
+            keep = 0
+            pos = end
+            while pos > 0:
+                start = max(0, pos - 4096)
+                f.seek(start)
+                newline = f.read(pos - start).rfind(b"\n")
+                if newline != -1:
+                    keep = start + newline + 1
+                    break
+                pos = start
+            if keep < end:
+                f.truncate(keep)
+
+    def append(self, record):
+        """Append one record; it is fsynced with the next group commit."""
+        line = (json.dumps(record) + "\n").encode()
+        with self.lock:
+            self.file.write(line)
+            self.file.flush()
+            if self.by_date is not None:
+                self.index(record, self.size)
+            self.size += len(line)
+            self.unsynced += 1
+            if self.unsynced >= SYNC_EVERY:
+                self.sync()
+
+    def sync(self):
+        """fsync every appended record; call with self.lock held."""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.unsynced = 0
+
+    def save(self):
+        """Make every record appended so far durable now."""
+        with self.lock:
+            if self.unsynced:
+                self.sync()
+
+    def autosave(self):
+        """Background thread: group-commit waiting records every SYNC_INTERVAL."""
+        while not self.closed.wait(SYNC_INTERVAL):
+            self.save()
+
+    def __iter__(self):
+        """Stream the records from disk without loading the whole file."""
+        with self.lock:
+            self.file.flush()
+        bad_lines = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # an append still in progress
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    bad_lines += 1
+                    continue
+                yield record
+        if bad_lines:
+            self.compact_async()
+
+    @staticmethod
+    def index_key(record, offset):
+        """Return (category key, (date, offset)) for one record."""
+        return str(record.get("category", "")).strip().lower(), (str(record.get("date", "")), offset)
+
+    def index(self, record, offset):
+        """Add one record's offset to the date and category indexes."""
+        category, entry = self.index_key(record, offset)
+        bisect.insort(self.by_date, entry)
+        bisect.insort(self.by_category.setdefault(category, []), entry)
+
+    def build_indexes(self):
+        """Stream the file once to index it; call with self.lock held."""
+        self.by_date = []
+        self.by_category = {}
+        bad_lines = 0
+        with open(self.path, "rb") as f:
+            offset = 0
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    bad_lines += 1
+                else:
+                    category, entry = self.index_key(record, offset)
+                    self.by_date.append(entry)
+                    self.by_category.setdefault(category, []).append(entry)
+                offset += len(line)
+        self.by_date.sort()
+        for entries in self.by_category.values():
+            entries.sort()
+        if bad_lines:
+            self.compact_async()
+
+    def query(self, start=None, end=None, category=None):
+        """Lazily yield expenses dated start..end (inclusive) in date order.
+
+        Dates are compared as YYYY-MM-DD strings; category matching ignores
+        case.  Either bound and the category may be None to leave it open.
+        """
+        with self.lock:
+            self.file.flush()
+            if self.by_date is None:
+                self.build_indexes()
+            if category is None:
+                entries = self.by_date
+            else:
+                entries = self.by_category.get(category.strip().lower(), [])
+            lo = 0 if start is None else bisect.bisect_left(entries, (start,))
+            hi = len(entries) if end is None else bisect.bisect_left(entries, (end + "\uffff",))
+            offsets = [offset for _, offset in entries[lo:hi]]
+            path = self.path
+        with open(path, "rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                yield json.loads(f.readline())
+
+    def compact(self):
+        """Rewrite the log without unreadable lines and swap it in atomically."""
+        with self.lock:
+            self.file.flush()
+            end = os.path.getsize(self.path)
+        tmp_path = self.path + ".tmp"
+        with open(self.path, "rb") as src, open(tmp_path, "wb") as dst:
+            while src.tell() < end:
+                line = src.readline()
+                try:
+                    json.loads(line)
+                except ValueError:
+                    continue
+                dst.write(line)
+            with self.lock:
+                # Records appended while the bulk was copied are already valid.
+                self.file.flush()
+                shutil.copyfileobj(src, dst)
+                dst.flush()
+                os.fsync(dst.fileno())
+                os.replace(tmp_path, self.path)
+                self.file.close()
+                self.file = open(self.path, "ab")
+                self.size = os.path.getsize(self.path)
+                self.unsynced = 0
+                self.by_date = self.by_category = None  # offsets moved; rebuild on next query
+
+    def compact_async(self):
+        """Start a background compaction unless one is already running."""
+        if self.compactor is None or not self.compactor.is_alive():
+            self.compactor = threading.Thread(target=self.compact, daemon=True)
+            self.compactor.start()
+
+    def close(self):
+        """Stop the background threads and make every record durable."""
+        self.closed.set()
+        self.autosaver.join()
+        if self.compactor is not None:
+            self.compactor.join()
+        self.save()
+        self.file.close()
+
+
+expenses = ExpenseLog()
 
 def add_expense():
     amount = float(input("Enter amount: "))
@@ -20,16 +245,28 @@ def add_expense():
     print("Expense added!")
 
 def view_expenses():
-    if not expenses:
-        print("No expenses recorded yet.")
+    start = input("From date (YYYY-MM-DD) or leave blank: ").strip() or None
+    end = input("To date (YYYY-MM-DD) or leave blank: ").strip() or None
+    category = input("Category or leave blank for all: ").strip() or None
+
+    results = enumerate(expenses.query(start, end, category), 1)
+    count = 0
+    total = 0.0
+    while True:
+        page = list(itertools.islice(results, PAGE_SIZE))
+        for count, expense in page:
+            total += expense['amount']
+            print(f"{count}. {expense['date']} | {expense['category']} | ${expense['amount']} | {expense['note']}")
+        if len(page) < PAGE_SIZE or input("Enter for more, q to stop: ").strip().lower() == "q":
+            break
+    if not count:
+        print("No expenses found.")
     else:
-        for i, expense in enumerate(expenses, 1):
-            print(f"{i}. {expense['date']} | {expense['category']} | ${expense['amount']} | {expense['note']}")
+        print(f"Shown: {count} expenses totalling ${total:.2f}")
 
 def save_expenses():
-    with open('expenses.json', 'w') as file:
-        json.dump(expenses, file)
-    print("Expenses saved to expenses.json")
+    expenses.save()
+    print(f"Expenses saved to {EXPENSES_FILE}")
 
 
 
@@ -49,6 +286,7 @@ while True:
     elif choice == "3":
         save_expenses()
     elif choice == "4":
+        expenses.close()
         print("Goodbye!")
         break
     else:
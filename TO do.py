@@ -1,13 +1,31 @@
-import json
-from datetime import datetime
+import bisect
+from datetime import date, datetime
+from functools import lru_cache
+
+from task_store import TaskStore, merge_rows
+
+
+@lru_cache(maxsize=None)
+def parse_deadline(deadline):
+    # Deadlines that don't parse sort after every real date.  Cached, since
+    # large lists share a few thousand distinct deadlines at most.
+    try:
+        return datetime.strptime(deadline, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return date.max
+
 
 class Task:
+    # No per-instance __dict__: a task is a fixed set of six fields.
+    __slots__ = ("id", "title", "priority", "deadline", "done", "version")
   
-    def __init__(self, title, priority, deadline, done=False):
+    def __init__(self, title, priority, deadline, done=False, task_id=None):
+        self.id = task_id
         self.title = title
         self.priority = priority
         self.deadline = deadline
         self.done = done
+        self.version = 0  # of the stored row this task was last read from or saved as
 
     def mark_done(self):
 
@@ -16,23 +34,97 @@ class Task:
     def to_dict(self):
        
         return {
+            "id": self.id,
             "title": self.title,
             "priority": self.priority,
             "deadline": self.deadline,
             "done": self.done
         }
 
+    def to_row(self):
+        return [self.id, self.title, self.priority, self.deadline, self.done, self.version]
+
+    def set_row(self, row):
+        self.id, self.title, self.priority, self.deadline, self.done, self.version = row
+
     @staticmethod
     def from_dict(data):
-        return Task(data["title"], data["priority"], data["deadline"], data["done"])
+        return Task(data["title"], data["priority"], data["deadline"], data["done"], data.get("id"))
+
+    @staticmethod
+    def from_rows(rows):
+        # Bulk decoder for task_store rows: fills the slots directly
+        # instead of building a dict and calling __init__ per task, and
+        # shares one string per distinct deadline.
+        new = object.__new__
+        deadlines = {}
+        tasks = []
+        append = tasks.append
+        for task_id, title, priority, deadline, done, version in rows:
+            task = new(Task)
+            task.id = task_id
+            task.title = title
+            task.priority = priority
+            task.deadline = deadlines.setdefault(deadline, deadline)
+            task.done = done
+            task.version = version
+            append(task)
+        return tasks
 
 
 class TodoList:
   
     def __init__(self, filename="tasks.json"):
         self.filename = filename
+        self.store = TaskStore(filename)
         self.tasks = []
+        # Sorted index keys ending in the task's position in self.tasks.
+        # Pending tasks sort before done ones, so the pending ones in
+        # deadline order are always the head of by_deadline.
+        self.by_priority = []  # (done, priority, deadline date, position)
+        self.by_deadline = []  # (done, deadline date, priority, position)
+        self.positions = None  # task id -> position, built when first needed
         self.load_tasks()
+        self.store.start_autosave()
+
+
+    # Indexes
+
+    def index_keys(self, position):
+        task = self.tasks[position]
+        deadline = parse_deadline(task.deadline)
+        return ((task.done, task.priority, deadline, position),
+                (task.done, deadline, task.priority, position))
+
+    def index_task(self, position):
+        priority_key, deadline_key = self.index_keys(position)
+        bisect.insort(self.by_priority, priority_key)
+        bisect.insort(self.by_deadline, deadline_key)
+
+    def unindex_task(self, position):
+        for index, key in zip((self.by_priority, self.by_deadline), self.index_keys(position)):
+            del index[bisect.bisect_left(index, key)]
+
+    def rebuild_indexes(self):
+        self.positions = None
+        keys = [self.index_keys(position) for position in range(len(self.tasks))]
+        self.by_priority = sorted(priority_key for priority_key, _ in keys)
+        self.by_deadline = sorted(deadline_key for _, deadline_key in keys)
+
+    def ordered_tasks(self, sort_by="priority"):
+        if sort_by == "priority":
+            return [self.tasks[key[-1]] for key in self.by_priority]
+        if sort_by == "deadline":
+            return [self.tasks[key[-1]] for key in self.by_deadline]
+        return self.tasks
+
+    def next_due(self, count):
+        due = []
+        for key in self.by_deadline[:count]:
+            if key[0]:
+                break  # reached the done tasks
+            due.append(self.tasks[key[-1]])
+        return due
 
 
     # Task Management
@@ -42,7 +134,11 @@ class TodoList:
         try:
             datetime.strptime(deadline, "%Y-%m-%d")  # Validate date format
             task = Task(title, priority, deadline)
+            self.store.add(task)
             self.tasks.append(task)
+            if self.positions is not None:
+                self.positions[task.id] = len(self.tasks) - 1
+            self.index_task(len(self.tasks) - 1)
             print(f" Task '{title}' added successfully!")
         except ValueError:
             print(" Invalid date format. Please use YYYY-MM-DD.")
@@ -52,45 +148,88 @@ class TodoList:
             print(" No tasks available.")
             return
 
-        if sort_by == "priority":
-            sorted_tasks = sorted(self.tasks, key=lambda t: t.priority)
-        elif sort_by == "deadline":
-            sorted_tasks = sorted(self.tasks, key=lambda t: t.deadline)
-        else:
-            sorted_tasks = self.tasks
-
         print("\n Your To-Do List:")
-        for i, task in enumerate(sorted_tasks, start=1):
+        for i, task in enumerate(self.ordered_tasks(sort_by), start=1):
             status = "✔" if task.done else ""
             print(f"{i}. [{status}] {task.title} | Priority: {task.priority} | Deadline: {task.deadline}")
         print("")
 
-    def mark_task_done(self, task_index):
-        
-        try:
-            task = self.tasks[task_index - 1]
-            task.mark_done()
-            print(f" Task '{task.title}' marked as done!")
-        except IndexError:
+    def view_next_due(self, count):
+        due = self.next_due(count)
+        if not due:
+            print(" No pending tasks.")
+            return
+
+        print(f"\n Next {len(due)} due:")
+        for i, task in enumerate(due, start=1):
+            print(f"{i}. {task.title} | Priority: {task.priority} | Deadline: {task.deadline}")
+        print("")
+
+    def mark_task_done(self, task_index, sort_by="priority"):
+        # task_index is the number shown by view_tasks(sort_by).
+        index = self.by_priority if sort_by == "priority" else self.by_deadline
+        if not 1 <= task_index <= len(index):
             print(" Invalid task number.")
+            return
+        position = index[task_index - 1][-1]
+        task = self.tasks[position]
+        if not task.done:
+            self.unindex_task(position)
+            task.mark_done()
+            self.index_task(position)
+            self.store.mark_dirty(task)
+        print(f" Task '{task.title}' marked as done!")
 
    
     # Persistence
    
+    # Only tasks changed since the last save are written; see task_store.
+
     def save_tasks(self):
         
-        with open(self.filename, "w") as f:
-            json.dump([task.to_dict() for task in self.tasks], f, indent=4)
+        self.store.save()
         print("💾 Tasks saved successfully!")
 
     def load_tasks(self):
         
-        try:
-            with open(self.filename, "r") as f:
-                data = json.load(f)
-                self.tasks = [Task.from_dict(task) for task in data]
-        except FileNotFoundError:
-            self.tasks = []
+        self.tasks = self.store.load(Task.from_rows)
+        self.rebuild_indexes()
+
+    # Other instances may share the file; pull in their changes before each menu.
+
+    def refresh(self):
+        
+        tasks, rows = self.store.poll(Task.from_rows)
+        if tasks is not None:
+            self.tasks = tasks
+            self.rebuild_indexes()
+            print(" Task list reloaded after changes made elsewhere.")
+            return
+
+        for row in rows:
+            self.apply_row(row)
+        if rows:
+            print(f" {len(rows)} task(s) updated from another instance.")
+
+    def apply_row(self, row):
+        
+        if self.positions is None:
+            self.positions = {task.id: position for position, task in enumerate(self.tasks)}
+        position = self.positions.get(row[0])
+        if position is None:
+            self.tasks.extend(Task.from_rows([row]))
+            position = len(self.tasks) - 1
+            self.positions[row[0]] = position
+        else:
+            task = self.tasks[position]
+            self.unindex_task(position)
+            task.set_row(merge_rows(task.to_row(), row))
+        self.index_task(position)
+
+    def close(self):
+        
+        self.store.close()
+        print("💾 Tasks saved successfully!")
 
   
     # CLI Interface
@@ -98,14 +237,16 @@ class TodoList:
     def run_cli(self):
        
         while True:
+            self.refresh()
             print("\n=== To-Do List Menu ===")
             print("1. Add Task")
             print("2. View Tasks (sorted by priority)")
             print("3. View Tasks (sorted by deadline)")
             print("4. Mark Task as Done")
-            print("5. Save & Exit")
+            print("5. View Next Due Tasks")
+            print("6. Save & Exit")
 
-            choice = input("Select an option (1-5): ")
+            choice = input("Select an option (1-6): ")
 
             if choice == "1":
                 title = input("Enter task title: ")
@@ -124,11 +265,17 @@ class TodoList:
                 except ValueError:
                     print(" Invalid input. Enter a number.")
             elif choice == "5":
-                self.save_tasks()
+                try:
+                    count = int(input("How many tasks? "))
+                    self.view_next_due(count)
+                except ValueError:
+                    print(" Invalid input. Enter a number.")
+            elif choice == "6":
+                self.close()
                 print(" Goodbye!")
                 break
             else:
-                print(" Invalid option. Please choose a number between 1-5.")
+                print(" Invalid option. Please choose a number between 1-6.")
 
 
 if __name__ == "__main__":
@@ -1,19 +1,538 @@
+import os
+import sys
+import threading
+import time
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from tkinter import messagebox
 
+# Board sizes offered in the GUI, mapped to how many in a row wins.
+BOARD_SIZES = {3: 3, 4: 4, 5: 4}
+
+# Per-move search budget for boards too large to solve outright.
+AI_MOVE_TIME_MS = 1000
+
+# How often the GUI checks whether a background AI search has finished.
+AI_POLL_MS = 20
+
+# Symmetry lookups permute bitboards CHUNK_BITS cells at a time.
+CHUNK_BITS = 9
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+
+@lru_cache(maxsize=None)
+def win_masks(size, k):
+    """Return the bitmask of every k-in-a-row line on a size x size board.
+
+    Bit r * size + c is set when cell (r, c) is part of the line.
+    """
+    masks = []
+    for r in range(size):
+        for c in range(size):
+            for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                end_r, end_c = r + dr * (k - 1), c + dc * (k - 1)
+                if 0 <= end_r < size and 0 <= end_c < size:
+                    masks.append(sum(1 << (r + dr * j) * size + c + dc * j for j in range(k)))
+    return tuple(masks)
+
+
+@lru_cache(maxsize=None)
+def symmetries(size):
+    """Return the 8 rotations/reflections of the grid as cell permutations.
+
+    symmetries(size)[s][i] is the cell that lands on position i under s.
+    """
+    cells = range(size * size)
+    rotate = [(size - 1 - i % size) * size + i // size for i in cells]
+    mirror = [(i // size) * size + size - 1 - i % size for i in cells]
+    perms = []
+    perm = tuple(cells)
+    for _ in range(4):
+        perms.append(perm)
+        perms.append(tuple(perm[j] for j in mirror))
+        perm = tuple(perm[j] for j in rotate)
+    return tuple(perms)
+
+
+@lru_cache(maxsize=None)
+def symmetry_tables(size):
+    """Return per-symmetry lookup tables that permute a bitboard chunk-wise.
+
+    symmetry_tables(size)[s][c][v] is the permuted bitboard contributed by
+    value v sitting in chunk c, so a whole board is permuted with one lookup
+    per chunk.
+    """
+    cells = size * size
+    tables = []
+    for perm in symmetries(size):
+        target = [0] * cells
+        for i, j in enumerate(perm):
+            target[j] = i
+        chunks = []
+        for start in range(0, cells, CHUNK_BITS):
+            width = min(CHUNK_BITS, cells - start)
+            chunks.append(tuple(
+                sum(1 << target[start + b] for b in range(width) if value >> b & 1)
+                for value in range(1 << width)
+            ))
+        tables.append(tuple(chunks))
+    return tuple(tables)
+
+
+def check_winner(bits, masks=win_masks(3, 3)):
+    """Return True if the bitboard contains a winning line."""
+    for mask in masks:
+        if bits & mask == mask:
+            return True
+    return False
+
+
+# A win scores WIN_SCORE - depth, where depth is the number of marks on the
+# board, so faster wins score higher and slower losses score less badly.
+# Every win is still positive and every loss negative, which keeps the sign
+# of each score equal to the plain +1/0/-1 minimax value.  Heuristic scores
+# at the search horizon stay far below WIN_SCORE.
+WIN_SCORE = 1000000
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Entries kept per engine on boards above 3x3; the whole 3x3 game fits easily.
+TABLE_MAX_ENTRIES = 200000
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the per-move budget runs out."""
+
+
+class SearchCancelled(Exception):
+    """Raised out of best_move when its cancel event is set mid-search."""
+
+
+class MinimaxEngine:
+    """Alpha-beta minimax search over bitboards backed by a transposition table.
+
+    The engine plays k-in-a-row on a size x size board.  Positions are stored
+    under a canonical key (the smallest encoding among the 8 symmetric
+    variants of the board), so a position and its rotations and reflections
+    are searched once.  Because X always moves first, the side to move is
+    implied by the board and the key needs nothing else.  Entries record
+    whether the score is exact or only a bound left by a cutoff, and how many
+    plies below the position were searched.  The table is reused across
+    moves and across games.  On 3x3 it holds at most every position and is
+    never trimmed; on larger boards it is capped at TABLE_MAX_ENTRIES, and
+    when full the shallower half of the entries is dropped so the deep
+    results near the root survive.
+    """
+
+    def __init__(self, size=3, k=3):
+        self.size = size
+        self.k = k
+        self.cells = size * size
+        self.full_mask = (1 << self.cells) - 1
+        self.win_masks = win_masks(size, k)
+        self.symmetry_tables = symmetry_tables(size)
+        # Cells on the most lines first: center, then corners, then edges on 3x3.
+        self.move_order = tuple(sorted(
+            range(self.cells),
+            key=lambda i: -sum(mask >> i & 1 for mask in self.win_masks)
+        ))
+        self.table = {}
+        self.max_entries = TABLE_MAX_ENTRIES if size > 3 else None
+        self.nodes = 0
+        self.deadline = None
+        self.cancel = None
+        # One search at a time per engine; deadline and cancel belong to it.
+        self.lock = threading.Lock()
+
+    def canonical_key(self, x_bits, o_bits):
+        """Return the symmetry-independent key for a board."""
+        best = None
+        for chunks in self.symmetry_tables:
+            x = o = shift = 0
+            for table in chunks:
+                x |= table[x_bits >> shift & CHUNK_MASK]
+                o |= table[o_bits >> shift & CHUNK_MASK]
+                shift += CHUNK_BITS
+            key = x << self.cells | o
+            if best is None or key < best:
+                best = key
+        return best
+
+    def evaluate(self, x_bits, o_bits):
+        """Heuristic score at the search horizon from O's point of view.
+
+        Every line still open to only one player counts for that player,
+        weighted by how many of its cells are already filled.
+        """
+        score = 0
+        for mask in self.win_masks:
+            x = x_bits & mask
+            o = o_bits & mask
+            if x and not o:
+                score -= 10 ** bin(x).count("1")
+            elif o and not x:
+                score += 10 ** bin(o).count("1")
+        return score
+
+    def best_move(self, x_bits, o_bits, player="O", time_limit_ms=None, cancel=None):
+        """Return the best empty cell for player ("O" maximizes, "X" minimizes).
+
+        Without a time limit the position is searched to the end of the game.
+        With one, iterative deepening searches one ply deeper at a time and
+        the move from the deepest completed iteration is played.  Setting the
+        cancel event (a threading.Event) aborts the search with
+        SearchCancelled.
+        """
+        occupied = x_bits | o_bits
+        moves = [i for i in self.move_order if not occupied >> i & 1]
+        if not moves:
+            return None
+        depth = bin(occupied).count("1")
+
+        with self.lock:
+            self.cancel = cancel
+            try:
+                if time_limit_ms is None:
+                    self.deadline = None
+                    return self.search_root(x_bits, o_bits, player, moves, self.cells)[0]
+
+                self.deadline = time.perf_counter() + time_limit_ms / 1000
+                best_move = moves[0]
+                try:
+                    for horizon in range(depth + 1, self.cells + 1):
+                        best_move, best_score = self.search_root(x_bits, o_bits, player, moves, horizon)
+                        # Search the previous best move first on the next iteration.
+                        moves.remove(best_move)
+                        moves.insert(0, best_move)
+                        if abs(best_score) > WIN_SCORE - self.cells - 1:
+                            break
+                except SearchTimeout:
+                    pass
+                return best_move
+            finally:
+                self.deadline = None
+                self.cancel = None
+
+    def search_root(self, x_bits, o_bits, player, moves, horizon):
+        """Search every root move down to horizon and return (move, score)."""
+        maximizing = player == "O"
+        best_score = -float('inf') if maximizing else float('inf')
+        best_move = None
+        depth = bin(x_bits | o_bits).count("1") + 1
+
+        for i in moves:
+            bit = 1 << i
+            # Children only need to beat the best score so far.
+            if maximizing:
+                score = self.minimax(x_bits, o_bits | bit, depth, False, best_score, float('inf'), horizon)
+            else:
+                score = self.minimax(x_bits | bit, o_bits, depth, True, -float('inf'), best_score, horizon)
+            if (score > best_score) if maximizing else (score < best_score):
+                best_score = score
+                best_move = i
+        return best_move, best_score
+
+    def minimax(self, x_bits, o_bits, depth, is_maximizing, alpha=-float('inf'), beta=float('inf'), horizon=None):
+        """Depth-adjusted score of the position from O's point of view.
+
+        depth is the number of marks on the board and the search stops at
+        depth == horizon (default: the end of the game).
+        """
+        if horizon is None or horizon > self.cells:
+            horizon = self.cells
+        draft = horizon - depth
+        key = self.canonical_key(x_bits, o_bits)
+        entry = self.table.get(key)
+        if entry is not None and entry[2] >= draft:
+            score, flag = entry[0], entry[1]
+            if flag == EXACT:
+                return score
+            if flag == LOWER:
+                alpha = max(alpha, score)
+            else:
+                beta = min(beta, score)
+            if alpha >= beta:
+                return score
+
+        self.nodes += 1
+        if self.nodes & 255 == 0:
+            if self.cancel is not None and self.cancel.is_set():
+                raise SearchCancelled()
+            if self.deadline is not None and time.perf_counter() > self.deadline:
+                raise SearchTimeout()
+
+        alpha_orig, beta_orig = alpha, beta
+        occupied = x_bits | o_bits
+        if check_winner(o_bits, self.win_masks):
+            score = WIN_SCORE - depth
+            draft = self.cells
+        elif check_winner(x_bits, self.win_masks):
+            score = depth - WIN_SCORE
+            draft = self.cells
+        elif occupied == self.full_mask:
+            score = 0
+        elif draft == 0:
+            score = self.evaluate(x_bits, o_bits)
+        elif is_maximizing:
+            score = -float('inf')
+            for i in self.move_order:
+                bit = 1 << i
+                if not occupied & bit:
+                    score = max(score, self.minimax(x_bits, o_bits | bit, depth + 1, False, alpha, beta, horizon))
+                    alpha = max(alpha, score)
+                    if alpha >= beta:
+                        break
+        else:
+            score = float('inf')
+            for i in self.move_order:
+                bit = 1 << i
+                if not occupied & bit:
+                    score = min(score, self.minimax(x_bits | bit, o_bits, depth + 1, True, alpha, beta, horizon))
+                    beta = min(beta, score)
+                    if alpha >= beta:
+                        break
+
+        if score <= alpha_orig:
+            flag = UPPER
+        elif score >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        if self.max_entries is not None and len(self.table) >= self.max_entries:
+            self.trim_table()
+        self.table[key] = (score, flag, draft)
+        return score
+
+    def trim_table(self):
+        """Drop the shallower half of the table to make room for new entries."""
+        drafts = sorted(entry[2] for entry in self.table.values())
+        cutoff = drafts[len(drafts) // 2]
+        kept = {key: entry for key, entry in self.table.items() if entry[2] > cutoff}
+        if len(kept) > self.max_entries // 2:
+            kept = dict(sorted(kept.items(), key=lambda item: -item[1][2])[:self.max_entries // 2])
+        self.table = kept
+
+
+_ENGINES = {}
+
+
+def get_engine(size=3, k=3):
+    """Return the shared engine for a board size, creating it on first use."""
+    if (size, k) not in _ENGINES:
+        _ENGINES[size, k] = MinimaxEngine(size, k)
+    return _ENGINES[size, k]
+
+
+# Solved 3x3 positions: one byte per board, indexed by reading the cells as
+# base-3 digits (0 empty, 1 X, 2 O); the byte is the best cell to play, or
+# NO_MOVE when the game is over or the position cannot be reached.
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ttt_book.bin")
+NO_MOVE = 255
+
+# TERNARY[mask] is the base-3 value of a 3x3 bitboard read as all 1-digits.
+TERNARY = tuple(sum(3 ** i for i in range(9) if mask >> i & 1) for mask in range(1 << 9))
+
+
+def book_index(x_bits, o_bits):
+    """Return the opening book slot for a 3x3 position."""
+    return TERNARY[x_bits] + 2 * TERNARY[o_bits]
+
+
+def build_opening_book(path=BOOK_FILE, engine=None):
+    """Solve every reachable 3x3 position and write the best moves to path.
+
+    Moves come from the exact engine search, so the book plays exactly like
+    the engine does.  Returns the number of positions stored.
+    """
+    engine = engine or MinimaxEngine()
+    book = bytearray([NO_MOVE]) * 3 ** 9
+    stack = [(0, 0)]
+    stored = 0
+    while stack:
+        x_bits, o_bits = stack.pop()
+        index = book_index(x_bits, o_bits)
+        occupied = x_bits | o_bits
+        if book[index] != NO_MOVE or check_winner(x_bits) or check_winner(o_bits) or occupied == engine.full_mask:
+            continue
+        o_to_move = bin(x_bits).count("1") > bin(o_bits).count("1")
+        book[index] = engine.best_move(x_bits, o_bits, "O" if o_to_move else "X")
+        stored += 1
+        for i in range(9):
+            if not occupied >> i & 1:
+                stack.append((x_bits, o_bits | 1 << i) if o_to_move else (x_bits | 1 << i, o_bits))
+
+    with open(path, "wb") as f:
+        f.write(book)
+    return stored
+
+
+class OpeningBook:
+    """Constant-time best-move lookup for 3x3 positions."""
+
+    def __init__(self, data):
+        self.data = data
+
+    @staticmethod
+    def load(path=BOOK_FILE):
+        """Load a book built by build_opening_book, or return None if missing."""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        if len(data) != 3 ** 9:
+            return None
+        return OpeningBook(data)
+
+    def lookup(self, x_bits, o_bits):
+        """Return the best cell for the side to move, or None if not stored."""
+        move = self.data[book_index(x_bits, o_bits)]
+        return None if move == NO_MOVE else move
+
+
+_BOOK = []
+
+
+def get_opening_book():
+    """Return the 3x3 opening book, loading it on first use (None if absent)."""
+    if not _BOOK:
+        _BOOK.append(OpeningBook.load())
+    return _BOOK[0]
+
+
+def choose_move(engine, x_bits, o_bits, player="O", cancel=None, time_limit_ms=AI_MOVE_TIME_MS, use_book=True):
+    """Return the AI's move: from the opening book on 3x3, else by search.
+
+    3x3 is always searched to the end; time_limit_ms applies to larger boards.
+    """
+    if engine.size == 3:
+        book = get_opening_book() if use_book else None
+        if book is not None:
+            move = book.lookup(x_bits, o_bits)
+            if move is not None:
+                return move
+        return engine.best_move(x_bits, o_bits, player, cancel=cancel)
+    return engine.best_move(x_bits, o_bits, player, time_limit_ms, cancel)
+
+
+# Background AI searches, so the Tk event loop never waits on one.
+AI_EXECUTOR = ThreadPoolExecutor(max_workers=1)
+
+
+def verify_engine(engine=None):
+    """Check the 3x3 engine against plain minimax on every reachable position.
+
+    Plain minimax is the original unpruned, depth-blind search scoring
+    +1/0/-1.  For every position where someone is to move, the engine's move
+    must reach the same value as the best move plain minimax can find, so
+    the AI is exactly as strong as before.  Returns the number of positions
+    checked and raises AssertionError on the first mismatch.
+    """
+    engine = engine or MinimaxEngine()
+    full_mask = engine.full_mask
+    plain = {}
+
+    def plain_value(x_bits, o_bits):
+        key = x_bits << 9 | o_bits
+        if key not in plain:
+            occupied = x_bits | o_bits
+            if check_winner(o_bits):
+                plain[key] = 1
+            elif check_winner(x_bits):
+                plain[key] = -1
+            elif occupied == full_mask:
+                plain[key] = 0
+            else:
+                o_to_move = bin(x_bits).count("1") > bin(o_bits).count("1")
+                values = [
+                    plain_value(x_bits, o_bits | 1 << i) if o_to_move else plain_value(x_bits | 1 << i, o_bits)
+                    for i in range(9) if not occupied >> i & 1
+                ]
+                plain[key] = max(values) if o_to_move else min(values)
+        return plain[key]
+
+    plain_value(0, 0)
+    checked = 0
+    for key, value in plain.items():
+        x_bits, o_bits = key >> 9, key & full_mask
+        if check_winner(x_bits) or check_winner(o_bits) or x_bits | o_bits == full_mask:
+            continue
+        o_to_move = bin(x_bits).count("1") > bin(o_bits).count("1")
+        player = "O" if o_to_move else "X"
+        move = engine.best_move(x_bits, o_bits, player)
+        if o_to_move:
+            result = plain_value(x_bits, o_bits | 1 << move)
+        else:
+            result = plain_value(x_bits | 1 << move, o_bits)
+        assert result == value, f"move {move} for {player} scores {result}, optimum is {value}"
+        checked += 1
+    return checked
+
+
+class TicTacToeBoard:
+    """Headless game state: the marks, whose turn it is, and the result.
+
+    Holds no Tk objects, so the GUI, scripts and benchmarks share it.
+    """
+
+    def __init__(self, size=3):
+        self.size = size
+        # Engines are shared per board size, so solved positions carry over.
+        self.engine = get_engine(size, BOARD_SIZES[size])
+        self.reset()
+
+    def reset(self):
+        """Clear the marks and give X the first move."""
+        self.bits = {"X": 0, "O": 0}
+        self.current_player = "X"
+
+    def occupied(self):
+        """Return the bitboard of all filled cells."""
+        return self.bits["X"] | self.bits["O"]
+
+    def is_legal(self, index):
+        """Return True if the cell exists and is empty."""
+        return 0 <= index < self.engine.cells and not self.occupied() >> index & 1
+
+    def legal_moves(self):
+        """Return the empty cells in index order."""
+        occupied = self.occupied()
+        return [i for i in range(self.engine.cells) if not occupied >> i & 1]
+
+    def play(self, index):
+        """Place the current player's mark.
+
+        Returns "win" or "tie" when the move ends the round (current_player
+        is then still the mover), otherwise passes the turn and returns None.
+        """
+        player = self.current_player
+        self.bits[player] |= 1 << index
+        if check_winner(self.bits[player], self.engine.win_masks):
+            return "win"
+        if self.occupied() == self.engine.full_mask:
+            return "tie"
+        self.current_player = "O" if player == "X" else "X"
+        return None
+
+
 class TicTacToeGame:
    
 
-    def __init__(self):
+    def __init__(self, size=3):
         self.window = tk.Tk()
         self.window.title("Tic-Tac-Toe")
         self.window.resizable(False, False)
 
         # Game state
-        self.current_player = "X"
-        self.board = [""] * 9  
+        self.state = TicTacToeBoard(size)
+        self.board = [""] * self.state.engine.cells  # view of self.state for the buttons
         self.buttons = []
 
+        # Background AI search in flight, if any, and its cancel event
+        self.ai_future = None
+        self.ai_cancel = None
+
         # Game mode: "AI" for single-player, "2P" for two-player
         self.game_mode = None
 
@@ -27,18 +546,27 @@ class TicTacToeGame:
 
         # Start the main loop
         self.window.mainloop()
+        self.cancel_ai_move()
 
     
     # GUI Initialization
  
     def create_mode_selection(self):
         """Create game mode selection buttons."""
-        mode_frame = tk.Frame(self.window)
-        mode_frame.grid(row=0, column=0, columnspan=3, pady=10)
+        self.mode_frame = tk.Frame(self.window)
+        self.mode_frame.grid(row=0, column=0, columnspan=self.state.size, pady=10)
 
-        tk.Label(mode_frame, text="Select Game Mode:").pack(side="left", padx=5)
-        tk.Button(mode_frame, text="Human vs AI", command=lambda: self.set_game_mode("AI")).pack(side="left", padx=5)
-        tk.Button(mode_frame, text="2 Players", command=lambda: self.set_game_mode("2P")).pack(side="left", padx=5)
+        tk.Label(self.mode_frame, text="Select Game Mode:").grid(row=0, column=0, padx=5)
+        tk.Button(self.mode_frame, text="Human vs AI", command=lambda: self.set_game_mode("AI")).grid(row=0, column=1, padx=5)
+        tk.Button(self.mode_frame, text="2 Players", command=lambda: self.set_game_mode("2P")).grid(row=0, column=2, padx=5)
+
+        tk.Label(self.mode_frame, text="Board Size:").grid(row=1, column=0, padx=5, pady=(5, 0))
+        for column, size in enumerate(BOARD_SIZES, start=1):
+            tk.Button(
+                self.mode_frame,
+                text=f"{size}x{size}",
+                command=lambda size=size: self.set_board_size(size)
+            ).grid(row=1, column=column, padx=5, pady=(5, 0))
 
     def set_game_mode(self, mode):
         """Set the selected game mode and reset the board."""
@@ -47,9 +575,25 @@ class TicTacToeGame:
         mode_text = "Human vs AI" if mode == "AI" else "2 Players"
         messagebox.showinfo("Game Mode Selected", f"🎮 Mode: {mode_text}")
 
+    def set_board_size(self, size):
+        """Rebuild the grid for a size x size board and reset the round."""
+        if size == self.state.size:
+            return
+        self.cancel_ai_move()
+        for button in self.buttons:
+            button.destroy()
+        self.buttons = []
+        self.state = TicTacToeBoard(size)
+        self.board = [""] * self.state.engine.cells
+        self.mode_frame.grid_configure(columnspan=size)
+        self.create_game_board()
+        self.score_label.grid_configure(row=size + 1, columnspan=size)
+        self.reset_board()
+        self.window.title(f"Tic-Tac-Toe ({size}x{size}, {BOARD_SIZES[size]} in a row)")
+
     def create_game_board(self):
-        """Create the 3x3 Tic-Tac-Toe button grid."""
-        for i in range(9):
+        """Create the size x size Tic-Tac-Toe button grid."""
+        for i in range(self.state.engine.cells):
             button = tk.Button(
                 self.window,
                 text="",
@@ -58,7 +602,7 @@ class TicTacToeGame:
                 height=2,
                 command=lambda index=i: self.handle_move(index)
             )
-            button.grid(row=(i // 3) + 1, column=i % 3)
+            button.grid(row=(i // self.state.size) + 1, column=i % self.state.size)
             self.buttons.append(button)
 
     def create_scoreboard(self):
@@ -69,7 +613,7 @@ class TicTacToeGame:
             font=("Helvetica", 12),
             fg="blue"
         )
-        self.score_label.grid(row=4, column=0, columnspan=3, pady=10)
+        self.score_label.grid(row=self.state.size + 1, column=0, columnspan=self.state.size, pady=10)
 
     def update_scoreboard(self):
         """Update the scoreboard text."""
@@ -84,114 +628,106 @@ class TicTacToeGame:
    
     def handle_move(self, index):
         """Process a move for the current player."""
-        if self.board[index] != "" or self.game_mode is None:
+        if not self.state.is_legal(index) or self.game_mode is None:
             return 
-        
+        if self.game_mode == "AI" and self.state.current_player == "O":
+            return  # AI is still thinking
+
         # Make move
-        self.board[index] = self.current_player
-        self.buttons[index].config(text=self.current_player)
+        player = self.state.current_player
+        result = self.place(index)
 
         # Check for win or tie
-        if self.check_winner(self.board, self.current_player):
-            messagebox.showinfo("Game Over", f"🎉 Player {self.current_player} wins!")
-            self.scores[self.current_player] += 1
+        if result == "win":
+            messagebox.showinfo("Game Over", f"🎉 Player {player} wins!")
+            self.scores[player] += 1
             self.update_scoreboard()
             self.reset_board()
             return
-        elif "" not in self.board:
+        elif result == "tie":
             messagebox.showinfo("Game Over", "🤝 It's a tie!")
             self.scores["Ties"] += 1
             self.update_scoreboard()
             self.reset_board()
             return
 
-        # Switch turn or let AI play
-        if self.game_mode == "AI" and self.current_player == "X":
-            self.current_player = "O"
-            self.window.after(500, self.ai_move)
-        else:
-            self.current_player = "O" if self.current_player == "X" else "X"
+        # Let AI play (the human is always X in AI mode)
+        if self.game_mode == "AI":
+            self.ai_move()
 
     def ai_move(self):
-        """AI calculates the optimal move using Minimax."""
-        best_score = -float('inf')
-        best_move = None
+        """Start the AI search on the background executor.
 
-        for i in range(9):
-            if self.board[i] == "":
-                self.board[i] = "O"
-                score = self.minimax(self.board, 0, False)
-                self.board[i] = ""
-                if score > best_score:
-                    best_score = score
-                    best_move = i
+        The GUI thread polls for the result with window.after, so Tk is never
+        touched from the worker and the window stays responsive meanwhile.
+        """
+        self.ai_cancel = threading.Event()
+        self.ai_future = AI_EXECUTOR.submit(
+            choose_move, self.state.engine, self.state.bits["X"], self.state.bits["O"], "O", self.ai_cancel
+        )
+        self.window.after(AI_POLL_MS, self.poll_ai_move, self.ai_future)
+
+    def poll_ai_move(self, future):
+        """Apply the AI's move once its search finishes."""
+        if future is not self.ai_future:
+            return  # cancelled by a reset or mode change
+        if not future.done():
+            self.window.after(AI_POLL_MS, self.poll_ai_move, future)
+            return
+        self.ai_future = self.ai_cancel = None
+        try:
+            best_move = future.result()
+        except SearchCancelled:
+            return
+        self.apply_ai_move(best_move)
+
+    def cancel_ai_move(self):
+        """Abort the background AI search, if one is running."""
+        if self.ai_future is not None:
+            self.ai_cancel.set()
+            self.ai_future = self.ai_cancel = None
 
+    def apply_ai_move(self, best_move):
+        """Play the AI's chosen move and check for the end of the round."""
         # Make AI move
-        self.board[best_move] = "O"
-        self.buttons[best_move].config(text="O")
+        result = self.place(best_move)
 
         # Check for win or tie
-        if self.check_winner(self.board, "O"):
+        if result == "win":
             messagebox.showinfo("Game Over", "🤖 AI wins!")
             self.scores["O"] += 1
             self.update_scoreboard()
             self.reset_board()
             return
-        elif "" not in self.board:
+        elif result == "tie":
             messagebox.showinfo("Game Over", "🤝 It's a tie!")
             self.scores["Ties"] += 1
             self.update_scoreboard()
             self.reset_board()
             return
 
-        self.current_player = "X"
-
-    def minimax(self, board_state, depth, is_maximizing):
-        """Minimax algorithm to determine the best move for AI."""
-        if self.check_winner(board_state, "O"):
-            return 1
-        elif self.check_winner(board_state, "X"):
-            return -1
-        elif "" not in board_state:
-            return 0
-
-        if is_maximizing:
-            best_score = -float('inf')
-            for i in range(9):
-                if board_state[i] == "":
-                    board_state[i] = "O"
-                    score = self.minimax(board_state, depth + 1, False)
-                    board_state[i] = ""
-                    best_score = max(score, best_score)
-            return best_score
-        else:
-            best_score = float('inf')
-            for i in range(9):
-                if board_state[i] == "":
-                    board_state[i] = "X"
-                    score = self.minimax(board_state, depth + 1, True)
-                    board_state[i] = ""
-                    best_score = min(score, best_score)
-            return best_score
-
-    def check_winner(self, board_state, player):
-        """Return True if the player has a winning combination."""
-        winning_combos = [
-            [0,1,2],[3,4,5],[6,7,8], 
-            [0,3,6],[1,4,7],[2,5,8], 
-            [0,4,8],[2,4,6]           
-        ]
-        return any(all(board_state[i] == player for i in combo) for combo in winning_combos)
+    def place(self, index):
+        """Play a cell for the current player and mirror it onto the board view."""
+        player = self.state.current_player
+        self.board[index] = player
+        self.buttons[index].config(text=player)
+        return self.state.play(index)
 
     def reset_board(self):
         """Clear the board for a new round and reset current player."""
-        for i in range(9):
+        self.cancel_ai_move()
+        self.state.reset()
+        for i in range(self.state.engine.cells):
             self.board[i] = ""
             self.buttons[i].config(text="")
-        self.current_player = "X"
 
 
 # Run the game
 
 if __name__ == "__main__":
-    TicTacToeGame()
+    if "--verify" in sys.argv:
+        print(f"✔ Engine matches plain minimax on {verify_engine()} positions")
+    elif "--build-book" in sys.argv:
+        print(f"✔ Stored {build_opening_book()} positions in {BOOK_FILE}")
+    else:
+        TicTacToeGame()
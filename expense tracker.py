@@ -1,27 +1,365 @@
+import argparse
+import csv
+import glob
+import json
+import operator
 import os
-import pandas as pd
-import matplotlib.pyplot as plt
+import time
 from datetime import datetime
 
+# pandas and matplotlib take most of a second to import, so they are
+# imported inside the functions that need them: adding a transaction and
+# reading cached totals never load either.
+
 # Setup paths
 
 DATA_FILE = "data/transactions.csv"
+PARQUET_DIR = "data/transactions.parquet"
+ROLLUP_FILE = "data/rollup.json"
 REPORT_FOLDER = "reports"
+COLUMNS = ["date", "type", "amount", "category"]
+
+# "csv" reads and appends DATA_FILE; "parquet" uses the typed, columnar
+# dataset in PARQUET_DIR (needs pyarrow; fill it with --migrate).
+STORAGE = "csv"
+
+# Rows held in memory at once when reading transactions.
+CHUNK_ROWS = 100000
+
+# True reads balances and reports straight from the data, chunk by chunk,
+# instead of from the rollup cache.
+STREAM = False
 
-os.makedirs("data", exist_ok=True)
-os.makedirs("reports", exist_ok=True)
+# Small Parquet part files (under PARQUET_SMALL_ROWS rows, as left by adds)
+# allowed before they are merged into one.  Bigger parts are never
+# rewritten, so merging costs the same however large the dataset grows.
+PARQUET_MAX_PARTS = 64
+PARQUET_SMALL_ROWS = 100000
+PARQUET_ROW_GROUP = 100000
+MIGRATE_CHUNK_ROWS = 500000
+
+FILTER_OPS = {"==": operator.eq, "!=": operator.ne, "<": operator.lt,
+              "<=": operator.le, ">": operator.gt, ">=": operator.ge}
 
 # Initialize CSV if missing
 
-if not os.path.exists(DATA_FILE):
-    df = pd.DataFrame(columns=["date", "type", "amount", "category"])
-    df.to_csv(DATA_FILE, index=False)
+def init_data_file():
+    if not os.path.exists(DATA_FILE):
+        os.makedirs(os.path.dirname(DATA_FILE), exist_ok=True)
+        with open(DATA_FILE, "w", newline="") as f:
+            csv.writer(f, lineterminator="\n").writerow(COLUMNS)
+
+
+# Typed columnar storage
+
+def to_typed_frame(df):
+    import pandas as pd
+    df = df[COLUMNS].copy()
+    # Unparsable dates are stored as NaT, as iter_chunks reads them from CSV,
+    # so one bad row can't fail a flush or stop a migration halfway.
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df["type"] = df["type"].astype("category")
+    df["category"] = df["category"].astype("category")
+    df["amount"] = df["amount"].astype("float64")
+    return df
+
+
+def write_parquet_part(df):
+    os.makedirs(PARQUET_DIR, exist_ok=True)
+    # Sorted dates give tight row-group min/max stats for date filters.
+    df = to_typed_frame(df).sort_values("date")
+    path = os.path.join(PARQUET_DIR, f"part-{time.time_ns()}-{len(df)}.parquet")
+    df.to_parquet(path, index=False, row_group_size=PARQUET_ROW_GROUP)
+
+
+def parquet_parts():
+    return sorted(glob.glob(os.path.join(PARQUET_DIR, "part-*.parquet")))
+
+
+def parquet_part_rows(path):
+    # Parts record their row count in the file name; older ones only in
+    # their footer.
+    fields = os.path.basename(path)[:-len(".parquet")].split("-")
+    if len(fields) == 3:
+        return int(fields[2])
+    import pyarrow.parquet as pq
+    return pq.ParquetFile(path).metadata.num_rows
+
+
+def small_parquet_parts():
+    return [path for path in parquet_parts() if parquet_part_rows(path) < PARQUET_SMALL_ROWS]
+
+
+def compact_parquet():
+    import pandas as pd
+    parts = small_parquet_parts()
+    if len(parts) > 1:
+        write_parquet_part(pd.read_parquet(parts))
+        for path in parts:
+            os.remove(path)
+
+
+def migrate_csv_to_parquet():
+    if parquet_parts():
+        print(f"❌ {PARQUET_DIR} already has data; not migrating again.")
+        return
+    import pandas as pd
+    rows = 0
+    for chunk in pd.read_csv(DATA_FILE, chunksize=MIGRATE_CHUNK_ROWS):
+        write_parquet_part(chunk)
+        rows += len(chunk)
+    print(f"✔ Migrated {rows} transactions from {DATA_FILE} to {PARQUET_DIR}")
+
+
+# Append-only writes
+
+class TransactionWriter:
+    """Appends transactions to storage without reading it back.
+
+    Rows are buffered until batch_size of them are pending (1 writes every
+    row straight away); flush() commits whatever is left, as appended CSV
+    lines or as one new Parquet part file.
+    """
+
+    def __init__(self, path=DATA_FILE, batch_size=1):
+        self.path = path
+        self.batch_size = batch_size
+        self.pending = []
+
+    def add(self, entry):
+        self.pending.append([entry[column] for column in COLUMNS])
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        before = source_fingerprint()
+        if STORAGE == "parquet":
+            import pandas as pd
+            write_parquet_part(pd.DataFrame(self.pending, columns=COLUMNS))
+            if len(small_parquet_parts()) > PARQUET_MAX_PARTS:
+                compact_parquet()
+        else:
+            init_data_file()
+            with open(self.path, "a", newline="") as f:
+                csv.writer(f, lineterminator="\n").writerows(self.pending)
+        rollup.record(self.pending, before, source_fingerprint())
+        self.pending = []
+
+
+# Monthly rollup cache
+
+def source_fingerprint():
+    # Size and mtime of every file behind the current storage mode.
+    if STORAGE == "parquet":
+        paths = parquet_parts()
+    else:
+        paths = [DATA_FILE] if os.path.exists(DATA_FILE) else []
+    fingerprint = [STORAGE]
+    for path in paths:
+        stat = os.stat(path)
+        fingerprint.append([os.path.basename(path), stat.st_size, stat.st_mtime_ns])
+    return fingerprint
+
+
+class RollupCache:
+    """Persisted (year, month, type, category) -> [sum, count] totals.
+
+    Writes made through TransactionWriter are folded in as they happen.
+    The cache also stores the fingerprint of the data it summarizes, and
+    if the files change any other way it is rebuilt on the next read.
+    """
+
+    def __init__(self, path=ROLLUP_FILE):
+        self.path = path
+        self.totals = None
+        self.fingerprint = None
+        self.loaded = False
+
+    def load(self):
+        self.loaded = True
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        self.fingerprint = data["fingerprint"]
+        self.totals = {tuple(row[:4]): row[4:] for row in data["rows"]}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "fingerprint": self.fingerprint,
+                "rows": [list(key) + value for key, value in self.totals.items()]
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    def get(self):
+        if not self.loaded:
+            self.load()
+        fingerprint = source_fingerprint()
+        if self.totals is None or self.fingerprint != fingerprint:
+            self.rebuild(fingerprint)
+        return self.totals
+
+    def rebuild(self, fingerprint):
+        self.totals = fold_totals(iter_chunks(), ["year", "month", "type", "category"])
+        self.fingerprint = fingerprint
+        self.save()
+
+    def record(self, rows, before, after):
+        if not self.loaded:
+            self.load()
+        if before == [STORAGE]:
+            self.totals = {}  # first write into empty storage; nothing to rebuild
+        elif self.totals is None or self.fingerprint != before:
+            return  # stale already; the next read rebuilds it
+        try:
+            for date, tr_type, amount, category in rows:
+                day = datetime.fromisoformat(str(date))
+                entry = self.totals.setdefault((day.year, day.month, tr_type, category), [0.0, 0])
+                entry[0] += float(amount)
+                entry[1] += 1
+        except ValueError:
+            self.totals = None  # a date only pandas can parse; rebuild on the next read
+            return
+        self.fingerprint = after
+        self.save()
+
+    def balance_totals(self):
+        totals = {"income": 0.0, "expense": 0.0}
+        for (_, _, tr_type, _), (total, _) in self.get().items():
+            if tr_type in totals:
+                totals[tr_type] += total
+        return totals["income"], totals["expense"]
+
+    # Rows without a category count towards the balance but, as in the
+    # original groupby("category") reports, are left out of the reports.
+
+    def category_totals(self, year, month):
+        totals = {}
+        for (entry_year, entry_month, _, category), (total, count) in self.get().items():
+            if (entry_year, entry_month) == (year, month) and count and category != "":
+                totals[category] = totals.get(category, 0.0) + total
+        return category_series(totals)
+
+    def monthly_totals(self, start, end):
+        import pandas as pd
+        months = {}
+        for (year, month, _, category), (total, count) in self.get().items():
+            if count and category != "" and start <= pd.Timestamp(year, month, 1) < end:
+                by_category = months.setdefault((year, month), {})
+                by_category[category] = by_category.get(category, 0.0) + total
+        return months
+
+
+writer = TransactionWriter()
+rollup = RollupCache()
 
 
 # Load data
+#
+# columns picks which columns to read and filters is a list of
+# (column, op, value) tuples that must all hold.  Parquet pushes both down
+# to the file reader, skipping unneeded columns and row groups; CSV applies
+# them after parsing.  Either way at most CHUNK_ROWS rows are read at once.
+
+def iter_chunks(columns=None, filters=None):
+    import pandas as pd
+    writer.flush()
+    wanted = list(columns or COLUMNS)
+    filters = filters or []
+    if STORAGE == "parquet":
+        if not parquet_parts():
+            return
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+        dataset = ds.dataset(PARQUET_DIR, format="parquet")
+        expression = pq.filters_to_expression(filters) if filters else None
+        for batch in dataset.to_batches(columns=wanted, filter=expression, batch_size=CHUNK_ROWS):
+            yield batch.to_pandas()
+        return
 
-def load_data():
-    return pd.read_csv(DATA_FILE)
+    if not os.path.exists(DATA_FILE):
+        return
+    needed = wanted + [column for column, _, _ in filters if column not in wanted]
+    for chunk in pd.read_csv(DATA_FILE, usecols=needed, chunksize=CHUNK_ROWS):
+        if "date" in chunk:
+            # A date that doesn't parse becomes NaT and is totalled under
+            # year and month 0 rather than failing every read.
+            chunk["date"] = pd.to_datetime(chunk["date"], errors="coerce")
+        for column, op, value in filters:
+            chunk = chunk[FILTER_OPS[op](chunk[column], value)]
+        yield chunk[wanted]
+
+
+def fold_totals(chunks, by):
+    # Sum and count amounts per group one chunk at a time, so memory stays
+    # bounded by the chunk size.  "year" and "month" come from the date.
+    totals = {}
+    for chunk in chunks:
+        if "year" in by or "month" in by:
+            chunk = chunk.assign(year=chunk["date"].dt.year, month=chunk["date"].dt.month)
+        # dropna=False keeps rows with an empty category (or an unparsable
+        # date) in the totals, under the same "" key record() uses.
+        grouped = chunk.groupby(by, observed=True, dropna=False)["amount"].agg(["sum", "count"])
+        for key, (total, count) in grouped.iterrows():
+            key = key if isinstance(key, tuple) else (key,)
+            key = tuple(
+                (0 if column in ("year", "month") else "") if part is None or part != part
+                else int(part) if column in ("year", "month") else str(part)
+                for column, part in zip(by, key)
+            )
+            entry = totals.setdefault(key, [0.0, 0])
+            entry[0] += float(total)
+            entry[1] += int(count)
+    return totals
+
+
+def month_range(year, month):
+    import pandas as pd
+    start = pd.Timestamp(year, month, 1)
+    return [("date", ">=", start), ("date", "<", start + pd.offsets.MonthBegin(1))]
+
+
+def category_series(totals):
+    # {category: amount} as the Series written to the monthly report CSV.
+    import pandas as pd
+    return pd.Series(totals, name="amount", dtype="float64").rename_axis("category").sort_index()
+
+
+def stream_balance_totals():
+    totals = fold_totals(iter_chunks(columns=["type", "amount"]), ["type"])
+    return totals.get(("income",), [0.0])[0], totals.get(("expense",), [0.0])[0]
+
+
+def stream_monthly_totals(start, end):
+    # {(year, month): {category: amount}} for months in [start, end), in one pass.
+    chunks = iter_chunks(columns=["date", "category", "amount"],
+                         filters=[("date", ">=", start), ("date", "<", end)])
+    months = {}
+    for (year, month, category), (total, _) in fold_totals(chunks, ["year", "month", "category"]).items():
+        if category != "":  # uncategorized rows stay out of reports
+            months.setdefault((year, month), {})[category] = total
+    return months
+
+
+def stream_category_totals(year, month):
+    chunks = iter_chunks(columns=["date", "category", "amount"], filters=month_range(year, month))
+    totals = fold_totals(chunks, ["category"])
+    return category_series({category: total for (category,), (total, _) in totals.items() if category != ""})
+
+
+def has_data():
+    if STORAGE == "parquet":
+        return bool(parquet_parts()) or bool(writer.pending)
+    if not os.path.exists(DATA_FILE):
+        return bool(writer.pending)
+    with open(DATA_FILE) as f:
+        return bool(f.readline() and f.readline()) or bool(writer.pending)
 
 
 
@@ -34,8 +372,12 @@ def add_transaction(tr_type):
     date = input("Enter date (YYYY-MM-DD) or press Enter for today: ")
     if date.strip() == "":
         date = datetime.today().strftime("%Y-%m-%d")
+    try:
+        datetime.strptime(date, "%Y-%m-%d")  # Validate date format
+    except ValueError:
+        print("\n❌ Date must be in YYYY-MM-DD format!\n")
+        return
 
-    df = load_data()
     new_entry = {
         "date": date,
         "type": tr_type,
@@ -43,20 +385,23 @@ def add_transaction(tr_type):
         "category": category
     }
 
-    df = df.append(new_entry, ignore_index=True)
-    df.to_csv(DATA_FILE, index=False)
+    writer.add(new_entry)
 
-    print("\n✔ Transaction saved successfully!\n")
+    if writer.pending:
+        print(f"\n✔ Transaction queued ({len(writer.pending)} pending)!\n")
+    else:
+        print("\n✔ Transaction saved successfully!\n")
 
 
 
 # View current balance
 
 def view_balance():
-    df = load_data()
-
-    total_income = df[df["type"] == "income"]["amount"].sum()
-    total_expense = df[df["type"] == "expense"]["amount"].sum()
+    writer.flush()
+    if STREAM:
+        total_income, total_expense = stream_balance_totals()
+    else:
+        total_income, total_expense = rollup.balance_totals()
     balance = total_income - total_expense
 
     print("\n------ Balance Summary ------")
@@ -69,38 +414,89 @@ def view_balance():
 
 # Monthly report + pie chart
 
+def write_report(category_summary, year, month):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    os.makedirs(REPORT_FOLDER, exist_ok=True)
+
+    # Export CSV
+    csv_path = f"{REPORT_FOLDER}/monthly_report_{year}_{month}.csv"
+    category_summary.to_csv(csv_path)
+
+    # Create pie chart; a standalone Figure keeps no global pyplot state,
+    # so this is safe to run in parallel worker processes.
+    fig = Figure(figsize=(6, 6))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    ax.pie(category_summary, labels=category_summary.index, autopct="%1.1f%%")
+    ax.set_title(f"Spending Breakdown - {year}/{month}")
+
+    chart_path = f"{REPORT_FOLDER}/monthly_piechart_{year}_{month}.png"
+    fig.savefig(chart_path)
+    return csv_path, chart_path
+
+
+def render_report_job(job):
+    totals, year, month = job
+    return write_report(category_series(totals), year, month)
+
+
+def parse_month_range(spec):
+    # "YYYY" for a whole year or "YYYY-MM:YYYY-MM" for an inclusive range.
+    import pandas as pd
+    if ":" in spec:
+        first, last = spec.split(":")
+    else:
+        first, last = f"{spec}-01", f"{spec}-12"
+    start = pd.Timestamp(first + "-01")
+    end = pd.Timestamp(last + "-01") + pd.offsets.MonthBegin(1)
+    return start, end
+
+
+def generate_batch_reports(spec, workers=None):
+    from concurrent.futures import ProcessPoolExecutor
+
+    start, end = parse_month_range(spec)
+
+    # Aggregate every month in one pass, then render the charts in parallel.
+    writer.flush()
+    if STREAM:
+        months = stream_monthly_totals(start, end)
+    else:
+        months = rollup.monthly_totals(start, end)
+
+    if not months:
+        print(f"\n❌ No transactions found for {spec}!\n")
+        return
+
+    jobs = [(months[key], f"{key[0]}", f"{key[1]:02d}") for key in sorted(months)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for (_, year, month), (csv_path, chart_path) in zip(jobs, pool.map(render_report_job, jobs)):
+            print(f"✔ {year}/{month}: {csv_path}, {chart_path}")
+    print(f"\n✔ Generated {len(jobs)} monthly report(s).\n")
+
+
 def generate_monthly_report():
-    df = load_data()
-    if df.empty:
+    if not has_data():
         print("No data available!")
         return
 
     month = input("Enter month (MM): ")
     year = input("Enter year (YYYY): ")
 
-    df["date"] = pd.to_datetime(df["date"])
-    monthly_data = df[(df["date"].dt.month == int(month)) &
-                      (df["date"].dt.year == int(year))]
+    # Category totals
+    writer.flush()
+    if STREAM:
+        category_summary = stream_category_totals(int(year), int(month))
+    else:
+        category_summary = rollup.category_totals(int(year), int(month))
 
-    if monthly_data.empty:
+    if category_summary.empty:
         print("\n❌ No transactions found for that month!\n")
         return
 
-    # Category totals
-    category_summary = monthly_data.groupby("category")["amount"].sum()
-
-    # Export CSV
-    csv_path = f"{REPORT_FOLDER}/monthly_report_{year}_{month}.csv"
-    category_summary.to_csv(csv_path)
-
-    # Create pie chart
-    plt.figure(figsize=(6, 6))
-    plt.pie(category_summary, labels=category_summary.index, autopct="%1.1f%%")
-    plt.title(f"Spending Breakdown - {year}/{month}")
-
-    chart_path = f"{REPORT_FOLDER}/monthly_piechart_{year}_{month}.png"
-    plt.savefig(chart_path)
-    plt.close()
+    csv_path, chart_path = write_report(category_summary, year, month)
 
     print("\n✔ Monthly report generated!")
     print(f"CSV saved to: {csv_path}")
@@ -131,6 +527,7 @@ def menu():
         elif choice == "4":
             generate_monthly_report()
         elif choice == "5":
+            writer.flush()
             print("Exiting program...")
             break
         else:
@@ -141,4 +538,35 @@ def menu():
 # Run program
 
 if __name__ == "__main__":
-    menu()
+    parser = argparse.ArgumentParser(description="Personal finance tracker.")
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="transactions to buffer before writing them together (default: write each one)")
+    parser.add_argument("--storage", choices=["csv", "parquet"], default=STORAGE,
+                        help="read and write the CSV file or the typed Parquet dataset")
+    parser.add_argument("--migrate", action="store_true",
+                        help=f"copy {DATA_FILE} into the Parquet dataset in {PARQUET_DIR} and exit")
+    parser.add_argument("--stream", action="store_true",
+                        help="compute balances and reports from the data in chunks, bypassing the rollup cache")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_ROWS,
+                        help="rows read into memory at once")
+    parser.add_argument("--batch-report", metavar="YYYY[-MM:YYYY-MM]",
+                        help="write reports for every month of a year or range, then exit")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes for --batch-report (default: one per CPU)")
+    args = parser.parse_args()
+
+    CHUNK_ROWS = max(1, args.chunk_size)
+    STREAM = args.stream
+    if args.migrate:
+        migrate_csv_to_parquet()
+        raise SystemExit
+    STORAGE = args.storage
+    if args.batch_report:
+        generate_batch_reports(args.batch_report, args.workers)
+        raise SystemExit
+
+    writer.batch_size = max(1, args.batch_size)
+    try:
+        menu()
+    finally:
+        writer.flush()
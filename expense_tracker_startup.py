@@ -0,0 +1,72 @@
+"""Startup-time guard for expense tracker.py.
+
+Launches the tracker the way scripts do (add one transaction, exit) in a
+scratch directory, times it, and checks that neither pandas nor matplotlib
+was imported on the way. Exits non-zero if either check fails:
+
+    python expense_tracker_startup.py
+    python expense_tracker_startup.py --runs 20 --max-ms 200
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+TRACKER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "expense tracker.py")
+HEAVY_MODULES = ("pandas", "matplotlib")
+SCENARIOS = {
+    "exit": "5\n",
+    "add": "1\n50\nSalary\n\n5\n",
+    "balance": "3\n5\n",
+}
+
+
+def run_tracker(workdir, stdin_text):
+    """Run the tracker once and return (seconds, top-level modules imported)."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", TRACKER],
+        cwd=workdir, input=stdin_text, capture_output=True, text=True, check=True
+    )
+    elapsed = time.perf_counter() - start
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            modules.add(line.rsplit("|", 1)[1].strip().split(".")[0])
+    return elapsed, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that expense tracker.py starts without heavy imports.")
+    parser.add_argument("--runs", type=int, default=10, help="timed runs per scenario")
+    parser.add_argument("--max-ms", type=float, default=250.0, help="allowed median wall time per run")
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, stdin_text in SCENARIOS.items():
+            timings = []
+            loaded = set()
+            for _ in range(max(1, args.runs)):
+                elapsed, modules = run_tracker(workdir, stdin_text)
+                timings.append(elapsed * 1000)
+                loaded |= modules.intersection(HEAVY_MODULES)
+            median = statistics.median(timings)
+            print(f"{name:<8}: median {median:.1f} ms | min {min(timings):.1f} ms | max {max(timings):.1f} ms")
+            if loaded:
+                failures.append(f"{name} imported {', '.join(sorted(loaded))}")
+            if median > args.max_ms:
+                failures.append(f"{name} took {median:.1f} ms (limit {args.max_ms:.0f} ms)")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,599 @@
+import argparse
+import csv
+import heapq
 import json
 import os
+import sqlite3
 
 DATA_FILE = "expenses.json"
+JOURNAL_FILE = "expenses.journal.jsonl"
+DB_FILE = "expenses.db"
+
+# Journal records allowed to pile up before they are folded into DATA_FILE.
+COMPACT_EVERY = 1000
+
+# Rows written per executemany call during a bulk import.
+IMPORT_CHUNK = 5000
+
+# Rejected import rows printed before the report is cut short.
+MAX_REJECTS_SHOWN = 20
+
+# Exact settlement searches every subset of the unsettled friends, so it is
+# only used for groups up to this size.
+EXACT_SETTLE_LIMIT = 12
+
+
+def to_cents(amount):
+    """Convert a money amount to integer cents."""
+    return int(round(amount * 100))
+
+
+def expense_deltas(expense):
+    """Yield (friend, cents) balance changes caused by one expense.
+
+    The payer is credited the full amount and each participant is debited
+    an equal share; leftover cents go to the first participants, so the
+    deltas always sum to exactly zero.
+    """
+    amount = to_cents(expense["amount"])
+    shared_by = expense["shared_by"]
+    share, remainder = divmod(amount, len(shared_by))
+    yield expense["paid_by"], amount
+    for i, participant in enumerate(shared_by):
+        yield participant, -(share + (1 if i < remainder else 0))
+
+
+class JsonLedger:
+    """Friends, expenses and balances held in memory and persisted through a journal.
+
+    DATA_FILE is a snapshot; every change made since is appended to
+    JOURNAL_FILE as one JSON line tagged with a sequence number.  Loading
+    replays the journal records newer than the snapshot, so a crash loses at
+    most the write in progress, and compaction folds the journal back into
+    the snapshot every COMPACT_EVERY records and on close.
+
+    Balances are kept in integer cents and updated by each expense's deltas
+    as it is added, edited or deleted, so they never need a full rescan.
+    """
+
+    def __init__(self, data_file=DATA_FILE, journal_file=JOURNAL_FILE):
+        self.data_file = data_file
+        self.journal_file = journal_file
+        self.friends = []
+        self.friend_set = set()
+        self.expenses = {}  # id -> expense, in insertion order
+        self.balances = {}  # friend -> cents
+        self.next_id = 1
+        self.seq = 0
+        self.pending = 0
+        torn = self.load()
+        self.journal = open(self.journal_file, "a")
+        if torn:
+            # Rewrite the snapshot so new records don't land after a torn line.
+            self.compact()
+
+    def load(self):
+        """Load the snapshot and replay the journal; return True if it was torn."""
+        if os.path.exists(self.data_file):
+            with open(self.data_file, "r") as f:
+                data = json.load(f)
+            self.friends = data["friends"]
+            self.friend_set = set(self.friends)
+            for expense in data["expenses"]:
+                # Snapshots written before expenses had ids get them here.
+                expense.setdefault("id", self.next_id)
+                self.expenses[expense["id"]] = expense
+                self.next_id = max(self.next_id, expense["id"] + 1)
+            self.seq = data.get("seq", 0)
+            if "balances" in data:
+                self.balances = data["balances"]
+            else:
+                self.balances = self.rebuild_balances()
+
+        try:
+            with open(self.journal_file, "r") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        return True
+                    if record["seq"] > self.seq:
+                        self.apply(record)
+                        self.seq = record["seq"]
+                    self.pending += 1
+        except FileNotFoundError:
+            pass
+        return False
+
+    def apply(self, record):
+        """Apply one journal record to the in-memory state."""
+        op = record["op"]
+        if op == "add_friend":
+            self.friends.append(record["name"])
+            self.friend_set.add(record["name"])
+            self.balances[record["name"]] = 0
+        elif op == "add_expense":
+            self.insert_expense(record["expense"])
+        elif op == "add_expenses":
+            for expense in record["expenses"]:
+                self.insert_expense(expense)
+        elif op == "edit_expense":
+            expense = record["expense"]
+            self.apply_deltas(self.expenses[expense["id"]], -1)
+            self.expenses[expense["id"]] = expense
+            self.apply_deltas(expense, 1)
+        elif op == "delete_expense":
+            self.apply_deltas(self.expenses.pop(record["id"]), -1)
+
+    def insert_expense(self, expense):
+        """Store a new expense and credit its balance changes."""
+        self.expenses[expense["id"]] = expense
+        self.next_id = max(self.next_id, expense["id"] + 1)
+        self.apply_deltas(expense, 1)
+
+    def apply_deltas(self, expense, sign):
+        """Add (sign=1) or take back (sign=-1) an expense's balance changes."""
+        for friend, cents in expense_deltas(expense):
+            self.balances[friend] += sign * cents
+
+    def commit(self, record):
+        """Apply a change in memory and append it durably to the journal."""
+        self.seq += 1
+        record["seq"] = self.seq
+        self.apply(record)
+        self.journal.write(json.dumps(record) + "\n")
+        self.journal.flush()
+        os.fsync(self.journal.fileno())
+        self.pending += 1
+        if self.pending >= COMPACT_EVERY:
+            self.compact()
+
+    def compact(self):
+        """Write a fresh snapshot atomically and empty the journal."""
+        tmp_file = self.data_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump({
+                "friends": self.friends,
+                "expenses": list(self.expenses.values()),
+                "balances": self.balances,
+                "seq": self.seq
+            }, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.data_file)
+        self.journal.close()
+        self.journal = open(self.journal_file, "w")
+        self.pending = 0
+
+    def close(self):
+        """Compact outstanding journal records and close the journal."""
+        if self.pending or not os.path.exists(self.data_file):
+            self.compact()
+        self.journal.close()
+
+    def has_friend(self, name):
+        """Return True if name is a known friend."""
+        return name in self.friend_set
+
+    def add_friend(self, name):
+        """Record a new friend."""
+        self.commit({"op": "add_friend", "name": name})
+
+    def add_expense(self, amount, paid_by, shared_by):
+        """Record an expense paid by one friend and shared by others; return its id."""
+        expense = {"id": self.next_id, "amount": amount, "paid_by": paid_by, "shared_by": shared_by}
+        self.commit({"op": "add_expense", "expense": expense})
+        return expense["id"]
+
+    def add_expenses(self, rows):
+        """Record many (amount, paid_by, shared_by) rows at once; return how many.
+
+        The whole batch is a single journal record, so after a crash it is
+        either replayed completely or not at all.
+        """
+        expenses = [
+            {"id": self.next_id + i, "amount": amount, "paid_by": paid_by, "shared_by": shared_by}
+            for i, (amount, paid_by, shared_by) in enumerate(rows)
+        ]
+        if expenses:
+            self.commit({"op": "add_expenses", "expenses": expenses})
+        return len(expenses)
+
+    def edit_expense(self, expense_id, amount, paid_by, shared_by):
+        """Replace an expense, moving balances by the difference."""
+        if expense_id not in self.expenses:
+            raise KeyError(expense_id)
+        expense = {"id": expense_id, "amount": amount, "paid_by": paid_by, "shared_by": shared_by}
+        self.commit({"op": "edit_expense", "expense": expense})
+
+    def delete_expense(self, expense_id):
+        """Remove an expense and take back its balance changes."""
+        if expense_id not in self.expenses:
+            raise KeyError(expense_id)
+        self.commit({"op": "delete_expense", "id": expense_id})
+
+    def load_expenses(self):
+        """Return every expense dict in id order."""
+        return list(self.expenses.values())
+
+    def expense_count(self):
+        """Return the number of recorded expenses."""
+        return len(self.expenses)
+
+    def recent_expenses(self, limit):
+        """Return the last limit expenses, oldest first."""
+        return list(self.expenses.values())[-limit:]
+
+    def expense_history(self, friend):
+        """Return every expense the friend paid for or shared in."""
+        return [
+            expense for expense in self.expenses.values()
+            if expense["paid_by"] == friend or friend in expense["shared_by"]
+        ]
+
+    def get_balances(self):
+        """Return a copy of every friend's balance in cents."""
+        return dict(self.balances)
+
+    def rebuild_balances(self):
+        """Recompute every balance in cents from the full expense history."""
+        balances = {friend: 0 for friend in self.friends}
+        for expense in self.expenses.values():
+            for friend, cents in expense_deltas(expense):
+                balances[friend] += cents
+        return balances
+
+    def verify_balances(self):
+        """Return {friend: (stored, rebuilt)} for balances that disagree."""
+        rebuilt = self.rebuild_balances()
+        return {
+            friend: (self.balances.get(friend, 0), cents)
+            for friend, cents in rebuilt.items()
+            if self.balances.get(friend, 0) != cents
+        }
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS friends (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS expenses (
+    id INTEGER PRIMARY KEY,
+    amount REAL NOT NULL,
+    amount_cents INTEGER NOT NULL,
+    paid_by INTEGER NOT NULL REFERENCES friends(id)
+);
+CREATE TABLE IF NOT EXISTS expense_participants (
+    expense_id INTEGER NOT NULL REFERENCES expenses(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    friend_id INTEGER NOT NULL REFERENCES friends(id),
+    share_cents INTEGER NOT NULL,
+    PRIMARY KEY (expense_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_expenses_paid_by ON expenses(paid_by, amount_cents);
+CREATE INDEX IF NOT EXISTS idx_participants_friend ON expense_participants(friend_id, share_cents);
+"""
+
+
+class SqliteLedger:
+    """Friends and expenses stored in an indexed SQLite database.
+
+    Each expense's participants live in a join table along with the cents
+    they owe, so balances and per-friend history are answered by indexed
+    queries instead of loading every record into Python.  Every change runs
+    in its own transaction.
+    """
+
+    def __init__(self, db_file=DB_FILE):
+        self.conn = sqlite3.connect(db_file)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
+
+    @property
+    def friends(self):
+        """Names of all friends in the order they were added."""
+        return [name for (name,) in self.conn.execute("SELECT name FROM friends ORDER BY id")]
+
+    def has_friend(self, name):
+        """Return True if name is a known friend."""
+        return self.conn.execute("SELECT 1 FROM friends WHERE name = ?", (name,)).fetchone() is not None
+
+    def friend_ids(self):
+        """Return {name: id} for every friend."""
+        return dict(self.conn.execute("SELECT name, id FROM friends"))
+
+    def add_friend(self, name):
+        """Record a new friend."""
+        with self.conn:
+            self.conn.execute("INSERT INTO friends (name) VALUES (?)", (name,))
+
+    def insert_expense(self, expense_id, amount, paid_by, shared_by, ids):
+        """Insert one expense and its participants; the caller owns the transaction."""
+        deltas = list(expense_deltas({"amount": amount, "paid_by": paid_by, "shared_by": shared_by}))
+        cursor = self.conn.execute(
+            "INSERT INTO expenses (id, amount, amount_cents, paid_by) VALUES (?, ?, ?, ?)",
+            (expense_id, amount, deltas[0][1], ids[paid_by])
+        )
+        expense_id = cursor.lastrowid
+        self.conn.executemany(
+            "INSERT INTO expense_participants (expense_id, position, friend_id, share_cents) VALUES (?, ?, ?, ?)",
+            [(expense_id, position, ids[name], -cents) for position, (name, cents) in enumerate(deltas[1:])]
+        )
+        return expense_id
+
+    def add_expense(self, amount, paid_by, shared_by):
+        """Record an expense paid by one friend and shared by others; return its id."""
+        with self.conn:
+            return self.insert_expense(None, amount, paid_by, shared_by, self.friend_ids())
+
+    def add_expenses(self, rows):
+        """Record many (amount, paid_by, shared_by) rows in one transaction; return how many."""
+        ids = self.friend_ids()
+        count = 0
+        with self.conn:
+            next_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM expenses").fetchone()[0]
+            expense_rows = []
+            participant_rows = []
+            for amount, paid_by, shared_by in rows:
+                deltas = list(expense_deltas({"amount": amount, "paid_by": paid_by, "shared_by": shared_by}))
+                expense_rows.append((next_id, amount, deltas[0][1], ids[paid_by]))
+                participant_rows.extend(
+                    (next_id, position, ids[name], -cents) for position, (name, cents) in enumerate(deltas[1:])
+                )
+                next_id += 1
+                count += 1
+                if len(expense_rows) >= IMPORT_CHUNK:
+                    self.write_expense_rows(expense_rows, participant_rows)
+                    expense_rows, participant_rows = [], []
+            self.write_expense_rows(expense_rows, participant_rows)
+        return count
+
+    def is_empty(self):
+        """Return True if the database holds no friends and no expenses."""
+        return self.conn.execute(
+            "SELECT NOT EXISTS (SELECT 1 FROM friends) AND NOT EXISTS (SELECT 1 FROM expenses)"
+        ).fetchone()[0] == 1
+
+    def copy_from(self, ledger):
+        """Copy every friend and expense of another ledger in one transaction; return the expense count.
+
+        Expenses keep their ids, so ones referred to by id before the move
+        can still be edited or deleted afterwards.
+        """
+        count = 0
+        with self.conn:
+            self.conn.executemany("INSERT INTO friends (name) VALUES (?)", [(name,) for name in ledger.friends])
+            ids = self.friend_ids()
+            expense_rows = []
+            participant_rows = []
+            for expense in ledger.load_expenses():
+                deltas = list(expense_deltas(expense))
+                expense_rows.append((expense["id"], expense["amount"], deltas[0][1], ids[expense["paid_by"]]))
+                participant_rows.extend(
+                    (expense["id"], position, ids[name], -cents) for position, (name, cents) in enumerate(deltas[1:])
+                )
+                count += 1
+                if len(expense_rows) >= IMPORT_CHUNK:
+                    self.write_expense_rows(expense_rows, participant_rows)
+                    expense_rows, participant_rows = [], []
+            self.write_expense_rows(expense_rows, participant_rows)
+        return count
+
+    def write_expense_rows(self, expense_rows, participant_rows):
+        """Bulk-insert prepared expense and participant rows."""
+        self.conn.executemany(
+            "INSERT INTO expenses (id, amount, amount_cents, paid_by) VALUES (?, ?, ?, ?)", expense_rows
+        )
+        self.conn.executemany(
+            "INSERT INTO expense_participants (expense_id, position, friend_id, share_cents) VALUES (?, ?, ?, ?)",
+            participant_rows
+        )
+
+    def edit_expense(self, expense_id, amount, paid_by, shared_by):
+        """Replace an expense and its participants."""
+        with self.conn:
+            if self.conn.execute("DELETE FROM expenses WHERE id = ?", (expense_id,)).rowcount == 0:
+                raise KeyError(expense_id)
+            self.insert_expense(expense_id, amount, paid_by, shared_by, self.friend_ids())
+
+    def delete_expense(self, expense_id):
+        """Remove an expense; its participants go with it."""
+        with self.conn:
+            if self.conn.execute("DELETE FROM expenses WHERE id = ?", (expense_id,)).rowcount == 0:
+                raise KeyError(expense_id)
+
+    def load_expenses(self, where="", params=()):
+        """Return expense dicts matching an optional WHERE clause, in id order."""
+        expenses = {}
+        for expense_id, amount, paid_by in self.conn.execute(
+            "SELECT e.id, e.amount, f.name FROM expenses e JOIN friends f ON f.id = e.paid_by "
+            + where + " ORDER BY e.id", params
+        ):
+            expenses[expense_id] = {"id": expense_id, "amount": amount, "paid_by": paid_by, "shared_by": []}
+        for expense_id, name in self.conn.execute(
+            "SELECT p.expense_id, f.name FROM expense_participants p JOIN friends f ON f.id = p.friend_id "
+            "WHERE p.expense_id IN (SELECT e.id FROM expenses e " + where + ") ORDER BY p.expense_id, p.position",
+            params
+        ):
+            expenses[expense_id]["shared_by"].append(name)
+        return list(expenses.values())
+
+    def expense_count(self):
+        """Return the number of recorded expenses."""
+        return self.conn.execute("SELECT COUNT(*) FROM expenses").fetchone()[0]
+
+    def recent_expenses(self, limit):
+        """Return the last limit expenses, oldest first."""
+        return self.load_expenses(
+            "WHERE e.id IN (SELECT id FROM expenses ORDER BY id DESC LIMIT ?)", (limit,)
+        )
+
+    def expense_history(self, friend):
+        """Return every expense the friend paid for or shared in."""
+        return self.load_expenses(
+            "WHERE e.paid_by = (SELECT id FROM friends WHERE name = ?) OR e.id IN ("
+            "SELECT expense_id FROM expense_participants "
+            "WHERE friend_id = (SELECT id FROM friends WHERE name = ?))",
+            (friend, friend)
+        )
+
+    def get_balances(self):
+        """Return every friend's balance in cents, summed by the database."""
+        return dict(self.conn.execute("""
+            SELECT f.name,
+                   COALESCE((SELECT SUM(amount_cents) FROM expenses WHERE paid_by = f.id), 0)
+                 - COALESCE((SELECT SUM(share_cents) FROM expense_participants WHERE friend_id = f.id), 0)
+            FROM friends f ORDER BY f.id
+        """))
+
+    def rebuild_balances(self):
+        """Recompute every balance in cents from the expense amounts and participants."""
+        balances = {friend: 0 for friend in self.friends}
+        for expense in self.load_expenses():
+            for friend, cents in expense_deltas(expense):
+                balances[friend] += cents
+        return balances
+
+    def verify_balances(self):
+        """Return {friend: (stored, rebuilt)} for balances that disagree."""
+        stored = self.get_balances()
+        rebuilt = self.rebuild_balances()
+        return {
+            friend: (stored.get(friend, 0), cents)
+            for friend, cents in rebuilt.items()
+            if stored.get(friend, 0) != cents
+        }
+
+
+BACKENDS = {"json": JsonLedger, "sqlite": SqliteLedger}
+
+
+def open_ledger(backend="json"):
+    """Open the ledger for a storage backend name from BACKENDS.
+
+    The first time the SQLite backend opens an empty database next to
+    existing JSON ledger files, it copies their friends and expenses in,
+    so switching backends does not start from an empty ledger.
+    """
+    ledger = BACKENDS[backend]()
+    if (backend == "sqlite" and ledger.is_empty()
+            and (os.path.exists(DATA_FILE) or os.path.exists(JOURNAL_FILE))):
+        source = JsonLedger()
+        try:
+            copied = ledger.copy_from(source)
+        finally:
+            source.close()
+        print(f"✔ Copied {len(ledger.friends)} friend(s) and {copied} expense(s) from {DATA_FILE} into {DB_FILE}\n")
+    return ledger
+
+
+def read_import_rows(path):
+    """Yield (line number, row dict) from a CSV file or a JSON-lines file.
+
+    CSV files need amount, paid_by and shared_by columns; shared_by holds the
+    participant names separated by ";" (or "," inside a quoted field).
+    """
+    with open(path, "r", newline="") as f:
+        if path.lower().endswith(".csv"):
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_no, json.loads(line)
+                except ValueError:
+                    yield line_no, None
+
+
+def validate_import_rows(rows, friends, rejected):
+    """Yield valid (amount, paid_by, shared_by) rows and append the rest to rejected.
+
+    friends is the preloaded set of known names; rejected collects
+    (line number, reason) pairs.
+    """
+    for line_no, row in rows:
+        if not isinstance(row, dict):
+            rejected.append((line_no, "not a valid record"))
+            continue
+        try:
+            amount = float(row["amount"])
+            paid_by = str(row["paid_by"]).strip()
+            shared_by = row["shared_by"]
+        except KeyError as e:
+            rejected.append((line_no, f"missing field {e}"))
+            continue
+        except (TypeError, ValueError):
+            rejected.append((line_no, f"invalid amount {row['amount']!r}"))
+            continue
+
+        if isinstance(shared_by, str):
+            separator = ";" if ";" in shared_by else ","
+            shared_by = [name.strip() for name in shared_by.split(separator) if name.strip()]
+        if not isinstance(shared_by, list) or not all(isinstance(name, str) for name in shared_by):
+            # None from a short CSV row, or a JSON null/number/nested value.
+            rejected.append((line_no, "invalid participants"))
+            continue
+        unknown = [name for name in [paid_by] + shared_by if name not in friends]
+        if amount != amount or amount in (float("inf"), float("-inf")):
+            rejected.append((line_no, f"invalid amount {row['amount']!r}"))
+        elif not shared_by:
+            rejected.append((line_no, "no participants"))
+        elif unknown:
+            rejected.append((line_no, f"unknown friend(s): {', '.join(unknown)}"))
+        else:
+            yield amount, paid_by, shared_by
 
 
-def initialize_data_file():
-    """Initialize JSON file if it doesn't exist."""
-    if not os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "w") as f:
-            json.dump({"friends": [], "expenses": []}, f)
-
+def import_expenses(ledger, path):
+    """Stream expenses from a CSV/JSONL file into the ledger in one commit.
 
-def load_data():
-    """Load data from JSON file."""
-    with open(DATA_FILE, "r") as f:
-        return json.load(f)
+    Returns (number imported, list of (line number, reason) rejects).
+    """
+    rejected = []
+    rows = validate_import_rows(read_import_rows(path), set(ledger.friends), rejected)
+    imported = ledger.add_expenses(rows)
+    return imported, rejected
 
 
-def save_data(data):
-    """Save data to JSON file."""
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+def report_import(path, imported, rejected):
+    """Print how an import went, listing the first rejected rows."""
+    print(f"✔ Imported {imported} expense(s) from {path}")
+    if rejected:
+        print(f"⚠️ Rejected {len(rejected)} row(s):")
+        for line_no, reason in rejected[:MAX_REJECTS_SHOWN]:
+            print(f"  line {line_no}: {reason}")
+        if len(rejected) > MAX_REJECTS_SHOWN:
+            print(f"  ... and {len(rejected) - MAX_REJECTS_SHOWN} more")
+    print("")
 
 
-def add_friend():
+def add_friend(ledger):
     """Add a new friend to the friends list."""
     name = input("Enter friend's name: ").strip()
     if not name:
         print("⚠️ Name cannot be empty!\n")
         return
 
-    data = load_data()
-    if name in data["friends"]:
+    if ledger.has_friend(name):
         print("⚠️ Friend already exists!\n")
         return
 
-    data["friends"].append(name)
-    save_data(data)
+    ledger.add_friend(name)
     print(f"✔ Friend '{name}' added successfully!\n")
 
 
-def add_expense():
+def add_expense(ledger):
     """Add a new expense and assign it to participants."""
-    data = load_data()
-    if not data["friends"]:
+    if not ledger.friends:
         print("⚠️ No friends found. Add friends first!\n")
         return
 
@@ -54,110 +604,202 @@ def add_expense():
         return
 
     paid_by = input("Who paid? (enter exact name): ").strip()
-    if paid_by not in data["friends"]:
+    if not ledger.has_friend(paid_by):
         print("⚠️ Friend not found in the list!\n")
         return
 
     print("\nSelect friends who shared this expense (comma-separated names):")
-    print(f"Available friends: {', '.join(data['friends'])}")
+    print(f"Available friends: {', '.join(ledger.friends)}")
     shared_by_input = input("Shared by: ").strip()
-    shared_by = [name.strip() for name in shared_by_input.split(",") if name.strip() in data["friends"]]
+    shared_by = [name.strip() for name in shared_by_input.split(",") if ledger.has_friend(name.strip())]
 
     if not shared_by:
         print("⚠️ No valid participants selected!\n")
         return
 
-    expense = {"amount": amount, "paid_by": paid_by, "shared_by": shared_by}
-    data["expenses"].append(expense)
-    save_data(data)
+    ledger.add_expense(amount, paid_by, shared_by)
     print(f"✔ Expense of {amount:.2f} added successfully!\n")
 
 
-def calculate_balances():
-    """Calculate net balance for each friend."""
-    data = load_data()
-    friends = data["friends"]
-    expenses = data["expenses"]
+def delete_expense(ledger):
+    """Delete an expense by its id."""
+    if not ledger.expense_count():
+        print("⚠️ No expenses found!\n")
+        return
 
-    balances = {friend: 0.0 for friend in friends}
+    print("\nRecent expenses:")
+    print_expenses(ledger.recent_expenses(10))
 
-    for exp in expenses:
-        amount = exp["amount"]
-        paid_by = exp["paid_by"]
-        shared_by = exp["shared_by"]
+    try:
+        expense_id = int(input("Enter expense id to delete: "))
+        ledger.delete_expense(expense_id)
+    except (ValueError, KeyError):
+        print("⚠️ Expense not found!\n")
+        return
+    print(f"✔ Expense #{expense_id} deleted!\n")
 
-        split_amount = amount / len(shared_by)
-        balances[paid_by] += amount
-        for participant in shared_by:
-            balances[participant] -= split_amount
 
-    return balances
+def print_expenses(expenses):
+    """Print one line per expense."""
+    for expense in expenses:
+        print(f"#{expense['id']}: {expense['amount']:.2f} paid by {expense['paid_by']}, "
+              f"shared by {', '.join(expense['shared_by'])}")
 
 
-def show_summary():
+def show_history(ledger):
+    """Display every expense a friend paid for or shared in."""
+    name = input("Enter friend's name: ").strip()
+    if not ledger.has_friend(name):
+        print("⚠️ Friend not found in the list!\n")
+        return
+
+    history = ledger.expense_history(name)
+    if not history:
+        print(f"No expenses involving {name} yet.\n")
+        return
+
+    print(f"\n====== HISTORY: {name} ======")
+    print_expenses(history)
+    print("=============================\n")
+
+
+def calculate_balances(ledger):
+    """Return each friend's net balance, kept up to date by the ledger."""
+    return {friend: cents / 100 for friend, cents in ledger.get_balances().items()}
+
+
+def verify_balances(ledger):
+    """Rebuild balances from the expense history and report any drift."""
+    diffs = ledger.verify_balances()
+    if not diffs:
+        print(f"✔ Balances match a full rebuild over {ledger.expense_count()} expenses.")
+        return True
+    print("⚠️ Stored balances differ from a full rebuild:")
+    for friend, (stored, rebuilt) in diffs.items():
+        print(f"{friend}: stored {stored / 100:.2f}, rebuilt {rebuilt / 100:.2f}")
+    return False
+
+
+def greedy_settlement(people):
+    """Settle (friend, cents) balances by pairing the largest debtor with the largest creditor.
+
+    Each transfer clears at least one side, so there are at most
+    len(people) - 1 transfers, found in O(n log n) with two heaps.
+    """
+    debtors = [(cents, name) for name, cents in people if cents < 0]
+    creditors = [(-cents, name) for name, cents in people if cents > 0]
+    heapq.heapify(debtors)
+    heapq.heapify(creditors)
+
+    transfers = []
+    while debtors and creditors:
+        debt, debtor = heapq.heappop(debtors)
+        credit, creditor = heapq.heappop(creditors)
+        amount = min(-debt, -credit)
+        transfers.append((debtor, creditor, amount))
+        if debt + amount:
+            heapq.heappush(debtors, (debt + amount, debtor))
+        if credit + amount:
+            heapq.heappush(creditors, (credit + amount, creditor))
+    return transfers
+
+
+def zero_sum_groups(people):
+    """Split (friend, cents) balances into the most groups that each sum to zero.
+
+    A group of k friends settles in k - 1 transfers, so the most groups
+    gives the fewest transfers overall.  Runs in O(2^n * n).
+    """
+    n = len(people)
+    full = (1 << n) - 1
+    total = [0] * (full + 1)
+    best = [0] * (full + 1)
+    for mask in range(1, full + 1):
+        low = mask & -mask
+        total[mask] = total[mask ^ low] + people[low.bit_length() - 1][1]
+        best[mask] = max(best[mask ^ (1 << i)] for i in range(n) if mask >> i & 1) + (total[mask] == 0)
+
+    # Walk back down the best chain; every zero-sum mask on it closes a group.
+    groups = []
+    mask = group_start = full
+    while mask:
+        for i in range(n):
+            if mask >> i & 1 and best[mask ^ (1 << i)] + (total[mask] == 0) == best[mask]:
+                mask ^= 1 << i
+                break
+        if total[mask] == 0:
+            groups.append([people[i] for i in range(n) if (group_start ^ mask) >> i & 1])
+            group_start = mask
+    return groups
+
+
+def settle_debts(balances, exact=False):
+    """Return (debtor, creditor, cents) transfers that settle cent balances.
+
+    The default greedy settlement needs at most one transfer fewer than the
+    number of friends owed or owing.  With exact=True, groups of up to
+    EXACT_SETTLE_LIMIT such friends are first split into independent
+    zero-sum groups, which gives the minimum possible number of transfers.
+    """
+    people = [(friend, cents) for friend, cents in balances.items() if cents]
+    if exact and len(people) <= EXACT_SETTLE_LIMIT:
+        transfers = []
+        for group in zero_sum_groups(people):
+            transfers.extend(greedy_settlement(group))
+        return transfers
+    return greedy_settlement(people)
+
+
+def show_summary(ledger, exact=False):
     """Display balances and debts between friends."""
-    balances = calculate_balances()
+    balances = ledger.get_balances()
     if not balances:
         print("⚠️ No friends or expenses found!\n")
         return
 
     print("\n====== BALANCE SUMMARY ======")
-    for friend, balance in balances.items():
-        print(f"{friend}: {balance:.2f}")
+    for friend, cents in balances.items():
+        print(f"{friend}: {cents / 100:.2f}")
     print("=============================\n")
 
     # Determine debts
-    debtors = {f: abs(v) for f, v in balances.items() if v < 0}
-    creditors = {f: v for f, v in balances.items() if v > 0}
+    transfers = settle_debts(balances, exact)
 
-    if not debtors:
+    if not transfers:
         print("Everyone is settled up! 🎉\n")
         return
 
     print("====== WHO OWES WHOM ======")
-    debtor_list = list(debtors.items())
-    creditor_list = list(creditors.items())
-
-    i = j = 0
-    while i < len(debtor_list) and j < len(creditor_list):
-        debtor, debt_amt = debtor_list[i]
-        creditor, credit_amt = creditor_list[j]
-
-        settle_amt = min(debt_amt, credit_amt)
-        print(f"{debtor} → {creditor}: {settle_amt:.2f}")
-
-        debt_amt -= settle_amt
-        credit_amt -= settle_amt
-        debtor_list[i] = (debtor, debt_amt)
-        creditor_list[j] = (creditor, credit_amt)
-
-        if debt_amt == 0:
-            i += 1
-        if credit_amt == 0:
-            j += 1
-
+    for debtor, creditor, cents in transfers:
+        print(f"{debtor} → {creditor}: {cents / 100:.2f}")
     print("=============================\n")
 
 
-def menu():
+def menu(ledger, exact=False):
     """Display main menu and handle user input."""
     while True:
         print("====== EXPENSE SPLITTER ======")
         print("1. Add Friend")
         print("2. Add Expense")
         print("3. Show Balance Summary")
-        print("4. Exit")
+        print("4. Delete Expense")
+        print("5. Show Friend History")
+        print("6. Exit")
         print("===============================")
 
         choice = input("Choose an option: ").strip()
 
         if choice == "1":
-            add_friend()
+            add_friend(ledger)
         elif choice == "2":
-            add_expense()
+            add_expense(ledger)
         elif choice == "3":
-            show_summary()
+            show_summary(ledger, exact)
         elif choice == "4":
+            delete_expense(ledger)
+        elif choice == "5":
+            show_history(ledger)
+        elif choice == "6":
             print("Goodbye! 👋")
             break
         else:
@@ -165,5 +807,22 @@ def menu():
 
 
 if __name__ == "__main__":
-    initialize_data_file()
-    menu()
+    parser = argparse.ArgumentParser(description="Split shared expenses between friends.")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="json", help="storage backend")
+    parser.add_argument("--exact", action="store_true", help="settle debts with the fewest possible transfers")
+    parser.add_argument("--verify", action="store_true", help="check stored balances against a full rebuild")
+    parser.add_argument("--import", dest="import_file", metavar="FILE",
+                        help="add every expense in a .csv or .jsonl file and exit")
+    args = parser.parse_args()
+
+    ledger = open_ledger(args.backend)
+    try:
+        if args.verify:
+            raise SystemExit(0 if verify_balances(ledger) else 1)
+        if args.import_file:
+            imported, rejected = import_expenses(ledger, args.import_file)
+            report_import(args.import_file, imported, rejected)
+            raise SystemExit(1 if rejected else 0)
+        menu(ledger, args.exact)
+    finally:
+        ledger.close()
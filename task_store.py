@@ -0,0 +1,400 @@
+"""Shared, incremental persistence for the to-do list apps ("TO do.py" and "to do 2.0").
+
+Tasks are stored as rows, [id, title, priority, deadline, done, version],
+rather than one dict per task: tasks.json holds {"fields": FIELDS,
+"seq": N, "rows": [...]} and parses several times faster than the old
+list of dicts, which is still read.  Every change since that snapshot is
+a record in tasks.json.journal, {"seq": N, "row": [...]}, after a header
+line naming the journal's generation; loading replays the records newer
+than the snapshot.  Saving therefore writes only the tasks marked dirty,
+and once the journal grows past COMPACT_EVERY records a background
+compaction folds it into a fresh snapshot, swapped in with an atomic
+rename.
+
+Several instances may use the same files at once.  Every write happens
+under an advisory lock on tasks.json.lock, after reading the records the
+other instances appended since this one last looked, so:
+
+- new tasks get ids and records get seqs that no other instance has used;
+- a changed task is written with the next version after the newest one
+  on disk, and if another instance changed it since this one read it,
+  the two rows are merged first (compare-and-swap with merge_rows).
+
+poll() notices other instances' saves from a stat of the journal and
+reads only the bytes appended since the last look.  Compaction keeps the
+last KEEP_RECORDS records in the new journal, so an instance that was a
+little behind carries on from there; only one that missed records folded
+away by the compaction reloads everything.
+"""
+import gc
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+FIELDS = ["id", "title", "priority", "deadline", "done", "version"]
+ID, DONE, VERSION = 0, 4, 5
+COMPACT_EVERY = 500      # journal records before a background compaction
+KEEP_RECORDS = 100       # records a compaction leaves in the journal for lagging instances
+AUTOSAVE_SECONDS = 5.0   # how often the autosave thread writes dirty tasks
+
+
+def dict_to_row(entry, position):
+    """Convert a task dict from the old list-of-dicts tasks.json into a row."""
+    return [position, entry["title"], entry["priority"], entry["deadline"], entry["done"], 0]
+
+
+def merge_rows(local, remote):
+    """Merge two copies of one task's row.
+
+    The newer version's fields win, but done stays set if either copy set
+    it: tasks are only ever marked done, never undone.
+    """
+    merged = list(remote if remote[VERSION] >= local[VERSION] else local)
+    merged[DONE] = local[DONE] or remote[DONE]
+    return merged
+
+
+def parse_record(line):
+    """Return (seq, row) for a journal line, or None for a header or torn line."""
+    try:
+        entry = json.loads(line)
+    except ValueError:
+        return None
+    if "row" in entry:
+        return entry["seq"], entry["row"]
+    return None
+
+
+def read_header(f):
+    """Return the journal's (generation, base seq) and leave f after the header."""
+    line = f.readline()
+    try:
+        entry = json.loads(line)
+    except ValueError:
+        entry = None
+    if isinstance(entry, dict) and "generation" in entry:
+        return entry["generation"], entry["base"]
+    f.seek(0)
+    return "", 0  # no header: the journal is empty or its header was torn by a crash
+
+
+def header_line(generation, base):
+    return (json.dumps({"generation": generation, "base": base}) + "\n").encode()
+
+
+class TaskStore:
+    """Snapshot + journal storage for Task objects with id, version and to_row()."""
+
+    def __init__(self, filename="tasks.json"):
+        self.filename = filename
+        self.journal_file = filename + ".journal"
+        self.lock_file = filename + ".lock"
+        self.dirty = {}                    # task id -> Task changed since the last save
+        self.dirty_lock = threading.Lock()  # held only briefly, so the UI never waits
+        self.io_lock = threading.Lock()     # serializes this process's threads before the file lock
+        self.lock_handle = None
+        self.seq = 0                  # newest record this instance has read or written
+        self.journal_generation = None
+        self.journal_offset = 0       # bytes of the journal read so far
+        self.journal_stat = None      # (inode, size, mtime) after the last read
+        self.journal_records = 0
+        self.latest = {}              # task id -> newest row seen in the journal
+        self.incoming = []            # other instances' rows not yet handed to poll()
+        self.reload_needed = False
+        self.next_id = 0
+        self.compactor = None
+        self.stopped = threading.Event()
+        self.autosaver = None
+
+    @contextmanager
+    def locked(self):
+        """Hold the advisory lock that every instance takes before touching the files."""
+        with self.io_lock:
+            if self.lock_handle is None:
+                self.lock_handle = open(self.lock_file, "a+")
+            handle = self.lock_handle
+            if fcntl:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+                else:
+                    handle.seek(0)
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def read_snapshot(self):
+        """Return the snapshot's rows, which are kept in id order, and its seq."""
+        try:
+            with open(self.filename) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return [], 0
+        if isinstance(data, dict):
+            return data["rows"], data["seq"]
+        return [dict_to_row(entry, position) for position, entry in enumerate(data)], 0
+
+    def iter_journal(self, f):
+        """Yield (seq, row) for the records from f's position on."""
+        for line in f:
+            record = parse_record(line)
+            if record is not None:
+                yield record
+
+    def journal_changed(self):
+        """Cheap check for journal writes since the last read: one stat call."""
+        try:
+            stat = os.stat(self.journal_file)
+        except FileNotFoundError:
+            return False
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns) != self.journal_stat
+
+    def read_journal(self, loading=False):
+        """Return rows appended by others since this instance last read; call with the lock held.
+
+        loading is set only by load(), whose seq comes from the snapshot
+        it has just read, so it can never have missed compacted records.
+        """
+        if not self.journal_changed():
+            return []
+        rows = []
+        with open(self.journal_file, "rb") as f:
+            generation, base = read_header(f)
+            if generation != self.journal_generation:
+                if base > self.seq and not loading:
+                    # Another instance compacted away records we never read.
+                    # Take the newest rows from its snapshot so our ids and
+                    # versions stay correct, and have poll() reload the app.
+                    self.reload_needed = True
+                    snapshot_rows, snapshot_seq = self.read_snapshot()
+                    for row in snapshot_rows:
+                        self.latest[row[ID]] = row
+                    if snapshot_rows:
+                        self.next_id = max(self.next_id, snapshot_rows[-1][ID] + 1)
+                    self.seq = max(self.seq, snapshot_seq)
+                self.journal_generation = generation
+                self.journal_records = 0
+            else:
+                f.seek(self.journal_offset)
+            for seq, row in self.iter_journal(f):
+                self.journal_records += 1
+                if seq > self.seq:
+                    self.seq = seq
+                    self.latest[row[ID]] = row
+                    self.next_id = max(self.next_id, row[ID] + 1)
+                    rows.append(row)
+            self.journal_offset = f.tell()
+            stat = os.fstat(f.fileno())
+        self.journal_stat = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        return rows
+
+    def append_journal(self, rows):
+        """Append rows as new records and fsync them; call with the lock held, journal read."""
+        lines = []
+        for row in rows:
+            self.seq += 1
+            self.latest[row[ID]] = row
+            lines.append(json.dumps({"seq": self.seq, "row": row}) + "\n")
+        with open(self.journal_file, "ab+") as f:
+            end = f.seek(0, os.SEEK_END)
+            if end == 0:
+                self.journal_generation = uuid.uuid4().hex
+                self.journal_records = 0
+                f.write(header_line(self.journal_generation, self.seq - len(rows)))
+            else:
+                f.seek(end - 1)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")  # keep a line torn by a crash apart from ours
+            f.write("".join(lines).encode())
+            f.flush()
+            os.fsync(f.fileno())
+            self.journal_offset = f.tell()
+            stat = os.fstat(f.fileno())
+        self.journal_stat = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        self.journal_records += len(rows)
+
+    def load(self, decode=None):
+        """Return every stored task row in id order, passed through decode if given.
+
+        The cyclic garbage collector is paused meanwhile: it would otherwise
+        rescan the growing heap of row lists and tasks over and over, which
+        costs more than the parsing itself on large lists.
+        """
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with self.locked():
+                rows, self.seq = self.read_snapshot()
+                self.journal_generation = None
+                self.journal_stat = None
+                self.journal_records = 0
+                self.latest = {}
+                self.incoming = []
+                self.reload_needed = False
+                changes = self.read_journal(loading=True)
+            if changes:
+                positions = {row[ID]: position for position, row in enumerate(rows)}
+                for row in changes:
+                    position = positions.get(row[ID])
+                    if position is None:
+                        positions[row[ID]] = len(rows)
+                        rows.append(row)
+                    else:
+                        rows[position] = row
+                rows.sort(key=lambda row: row[ID])  # nearly sorted already, so cheap
+            self.next_id = max(self.next_id, rows[-1][ID] + 1) if rows else self.next_id
+            return decode(rows) if decode else rows
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def add(self, task):
+        """Give a new task the next free id and write it straight away."""
+        with self.locked():
+            self.incoming.extend(self.read_journal())
+            task.id = self.next_id
+            self.next_id += 1
+            task.version += 1
+            self.append_journal([task.to_row()])
+
+    def mark_dirty(self, task):
+        """Queue a changed task for the next save."""
+        with self.dirty_lock:
+            self.dirty[task.id] = task
+
+    def save(self):
+        """Write every dirty task as the next version after the newest on disk."""
+        with self.dirty_lock:
+            dirty, self.dirty = self.dirty, {}
+        if not dirty:
+            return
+        with self.locked():
+            self.incoming.extend(self.read_journal())
+            rows = []
+            for task in dirty.values():
+                row = task.to_row()
+                latest = self.latest.get(row[ID])
+                if latest is not None and latest[VERSION] > row[VERSION]:
+                    # Changed by another instance since we read it.
+                    row = merge_rows(row, latest)
+                    self.incoming.append(row)
+                row[VERSION] = max(row[VERSION], latest[VERSION] if latest else 0) + 1
+                task.version = row[VERSION]
+                rows.append(row)
+            self.append_journal(rows)
+        if self.journal_records >= COMPACT_EVERY:
+            self.compact_async()
+
+    def poll(self, decode):
+        """Pick up the changes other instances saved since the last poll.
+
+        Returns (tasks, rows).  Normally tasks is None and rows holds just
+        the changed rows, for the caller to merge into its tasks with
+        merge_rows.  If this instance fell too far behind, tasks is the
+        whole list reloaded and passed through decode instead.
+        """
+        if not (self.incoming or self.reload_needed or self.journal_changed()):
+            return None, []
+        with self.locked():
+            self.incoming.extend(self.read_journal())
+            rows, self.incoming = self.incoming, []
+        if self.reload_needed:
+            self.save()
+            return self.load(decode), []
+        return None, rows
+
+    def write_snapshot(self, rows, seq):
+        """Atomically replace the snapshot; call with the lock held."""
+        tmp_file = self.filename + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump({"fields": FIELDS, "seq": seq, "rows": rows}, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.filename)
+
+    def compact(self):
+        """Fold the journal into a fresh snapshot, keeping its last KEEP_RECORDS records."""
+        with self.locked():
+            self.incoming.extend(self.read_journal())
+            rows, seq = self.read_snapshot()
+            try:
+                with open(self.journal_file, "rb") as f:
+                    read_header(f)
+                    records = list(self.iter_journal(f))
+            except FileNotFoundError:
+                records = []
+            positions = {row[ID]: position for position, row in enumerate(rows)}
+            for record_seq, row in records:
+                if record_seq <= seq:
+                    continue  # kept by an earlier compaction; already in the snapshot
+                seq = record_seq
+                position = positions.get(row[ID])
+                if position is None:
+                    positions[row[ID]] = len(rows)
+                    rows.append(row)
+                else:
+                    rows[position] = row
+            rows.sort(key=lambda row: row[ID])
+            self.write_snapshot(rows, seq)
+
+            # Records in both the snapshot and the journal are harmless: they
+            # replace a row with the same row, and loading skips them by seq.
+            kept = records[-KEEP_RECORDS:]
+            generation = uuid.uuid4().hex
+            tmp_file = self.journal_file + ".tmp"
+            with open(tmp_file, "wb") as f:
+                f.write(header_line(generation, kept[0][0] - 1 if kept else seq))
+                for record_seq, row in kept:
+                    f.write((json.dumps({"seq": record_seq, "row": row}) + "\n").encode())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.journal_file)
+            stat = os.stat(self.journal_file)
+            self.journal_generation = generation
+            self.journal_offset = stat.st_size
+            self.journal_stat = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            self.journal_records = len(kept)
+
+    def compact_async(self):
+        """Start a background compaction unless one is already running."""
+        if self.compactor is None or not self.compactor.is_alive():
+            self.compactor = threading.Thread(target=self.compact, daemon=True)
+            self.compactor.start()
+
+    def start_autosave(self, interval=AUTOSAVE_SECONDS):
+        """Save dirty tasks every interval seconds on a background thread."""
+        def autosave():
+            while not self.stopped.wait(interval):
+                self.save()
+
+        self.autosaver = threading.Thread(target=autosave, daemon=True)
+        self.autosaver.start()
+
+    def close(self):
+        """Stop autosaving and save what is dirty.
+
+        The journal is left for other instances to read; it is compacted
+        here only if it is already due.
+        """
+        self.stopped.set()
+        if self.autosaver is not None:
+            self.autosaver.join()
+        if self.compactor is not None:
+            self.compactor.join()
+        self.save()
+        if self.journal_records >= COMPACT_EVERY:
+            self.compact()
+        if self.lock_handle is not None:
+            self.lock_handle.close()
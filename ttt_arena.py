@@ -0,0 +1,156 @@
+"""Headless self-play arena for the Tic-Tac-Toe engine.
+
+Plays many games between the AI and/or a random player across a process
+pool and reports throughput, search speed, per-move latency and results:
+
+    python ttt_arena.py --games 5000 --x ai --o random
+    python ttt_arena.py --games 200 --size 4 --move-ms 50 --openings 2
+"""
+import argparse
+import json
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from TTT import BOARD_SIZES, TicTacToeBoard, choose_move
+
+
+def play_game(size, players, rng, use_book, move_ms, openings, fresh_table):
+    """Play one game and return (result, AI move latencies, nodes searched)."""
+    board = TicTacToeBoard(size)
+    engine = board.engine
+    if fresh_table:
+        engine.table.clear()
+    latencies = []
+    nodes = 0
+    ply = 0
+
+    while True:
+        player = board.current_player
+        if players[player] == "random" or ply < openings:
+            move = rng.choice(board.legal_moves())
+        else:
+            start_nodes = engine.nodes
+            start = time.perf_counter()
+            move = choose_move(engine, board.bits["X"], board.bits["O"], player,
+                               time_limit_ms=move_ms, use_book=use_book)
+            latencies.append(time.perf_counter() - start)
+            nodes += engine.nodes - start_nodes
+
+        result = board.play(move)
+        ply += 1
+        if result == "win":
+            return player, latencies, nodes
+        if result == "tie":
+            return "tie", latencies, nodes
+
+
+def run_batch(task):
+    """Play a batch of games in one worker process and return its totals."""
+    first_game, games, options = task
+    results = Counter()
+    latencies = []
+    nodes = 0
+    for game in range(first_game, first_game + games):
+        rng = random.Random(options["seed"] * 1000003 + game)
+        result, game_latencies, game_nodes = play_game(
+            options["size"], options["players"], rng, options["use_book"],
+            options["move_ms"], options["openings"], options["fresh_table"]
+        )
+        results[result] += 1
+        latencies.extend(game_latencies)
+        nodes += game_nodes
+    return results, latencies, nodes
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def run_arena(games, workers, options):
+    """Spread the games over a process pool and return the summary dict."""
+    batch = max(1, -(-games // (workers * 4)))
+    tasks = [(start, min(batch, games - start), options) for start in range(0, games, batch)]
+
+    results = Counter()
+    latencies = []
+    nodes = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for batch_results, batch_latencies, batch_nodes in pool.map(run_batch, tasks):
+            results.update(batch_results)
+            latencies.extend(batch_latencies)
+            nodes += batch_nodes
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    search_time = sum(latencies)
+    return {
+        "games": games,
+        "seconds": elapsed,
+        "games_per_sec": games / elapsed,
+        "ai_moves": len(latencies),
+        "nodes": nodes,
+        "nodes_per_sec": nodes / search_time if search_time else 0.0,
+        "latency_ms": {
+            name: percentile(latencies, pct) * 1000
+            for name, pct in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100))
+        },
+        "x_win_rate": results["X"] / games,
+        "o_win_rate": results["O"] / games,
+        "draw_rate": results["tie"] / games,
+    }
+
+
+def print_report(summary, options):
+    """Print the arena summary as a readable table."""
+    latency = summary["latency_ms"]
+    print("\n====== TIC-TAC-TOE ARENA ======")
+    print(f"Board      : {options['size']}x{options['size']}, {BOARD_SIZES[options['size']]} in a row")
+    print(f"Players    : X={options['players']['X']}  O={options['players']['O']}")
+    print(f"Games      : {summary['games']} in {summary['seconds']:.2f}s ({summary['games_per_sec']:.1f} games/sec)")
+    print(f"AI moves   : {summary['ai_moves']}, {summary['nodes']} nodes ({summary['nodes_per_sec']:.0f} nodes/sec)")
+    print(f"Latency ms : p50 {latency['p50']:.3f} | p90 {latency['p90']:.3f} | p99 {latency['p99']:.3f} | max {latency['max']:.3f}")
+    print(f"Results    : X {summary['x_win_rate']:.1%} | O {summary['o_win_rate']:.1%} | Draw {summary['draw_rate']:.1%}")
+    print("===============================\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Tic-Tac-Toe AI with headless self-play.")
+    parser.add_argument("--games", type=int, default=1000, help="number of games to play")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--size", type=int, choices=sorted(BOARD_SIZES), default=3, help="board size")
+    parser.add_argument("--x", choices=("ai", "random"), default="ai", help="player for X")
+    parser.add_argument("--o", choices=("ai", "random"), default="random", help="player for O")
+    parser.add_argument("--move-ms", type=int, default=100, help="AI time budget per move on boards above 3x3")
+    parser.add_argument("--openings", type=int, default=0, help="random plies at the start of each game")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the random moves")
+    parser.add_argument("--no-book", action="store_true", help="search every 3x3 move instead of using the opening book")
+    parser.add_argument("--fresh-table", action="store_true", help="clear the transposition table before each game")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args()
+
+    options = {
+        "size": args.size,
+        "players": {"X": args.x, "O": args.o},
+        "use_book": not args.no_book,
+        "move_ms": args.move_ms,
+        "openings": args.openings,
+        "seed": args.seed,
+        "fresh_table": args.fresh_table,
+    }
+    summary = run_arena(args.games, max(1, args.workers), options)
+    if args.json:
+        print(json.dumps(summary, indent=4))
+    else:
+        print_report(summary, options)
+
+
+if __name__ == "__main__":
+    main()